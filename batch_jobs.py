@@ -16,6 +16,8 @@ import threading
 import time
 from pathlib import Path
 
+from batch_workers import DEFAULT_CATALOG_HTTP_WORKERS, catalog_http_workers_per_shard
+
 
 ROOT = Path(__file__).resolve().parent
 
@@ -267,6 +269,8 @@ def run_catalog(args):
             str(int(args.page_load_timeout)),
             "--retries",
             str(int(args.retries)),
+            "--http-workers",
+            str(int(args.http_workers)),
         ]
         if args.all_pages:
             command.append("--all")
@@ -309,6 +313,8 @@ def run_catalog(args):
             str(shard_index),
             "--shard-count",
             str(workers),
+            "--http-workers",
+            str(catalog_http_workers_per_shard(args.http_workers, workers)),
         ]
         if args.all_pages:
             command.append("--all")
@@ -373,6 +379,7 @@ def main():
     catalog.add_argument("--retries", type=int, default=1)
     catalog.add_argument("--headless", action="store_true")
     catalog.add_argument("--workers", type=int, default=1)
+    catalog.add_argument("--http-workers", type=int, default=DEFAULT_CATALOG_HTTP_WORKERS, help="Total concurrent HTTP page fetches, split across shards")
 
     details = subparsers.add_parser("product-details")
     details.add_argument("--db", default="sealed_market.db")
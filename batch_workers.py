@@ -14,6 +14,12 @@ from pathlib import Path
 
 
 ROOT = Path(__file__).resolve().parent
+DEFAULT_CATALOG_HTTP_WORKERS = 10
+
+
+def catalog_http_workers_per_shard(total_http_workers, shard_count):
+    """Split the catalog HTTP concurrency budget across shard processes."""
+    return max(1, int(total_http_workers) // max(1, int(shard_count)))
 
 
 def read_catalog_csv(path):
@@ -187,6 +193,8 @@ def build_catalog_worker_command(args, shard_index, shard_count, output_path):
         str(shard_index),
         "--shard-count",
         str(shard_count),
+        "--http-workers",
+        str(catalog_http_workers_per_shard(args.http_workers, shard_count)),
     ]
     if args.all:
         command.append("--all")
@@ -270,6 +278,8 @@ def run_catalog_batch(args):
             str(args.page_load_timeout),
             "--retries",
             str(args.retries),
+            "--http-workers",
+            str(args.http_workers),
         ]
         if args.all:
             command.append("--all")
@@ -454,6 +464,7 @@ def make_parser():
     catalog.add_argument("--product-type-name", default="Sealed Products")
     catalog.add_argument("--headless", action="store_true")
     catalog.add_argument("--workers", type=int, default=4)
+    catalog.add_argument("--http-workers", type=int, default=DEFAULT_CATALOG_HTTP_WORKERS, help="Total concurrent HTTP page fetches, split across shards")
     catalog.add_argument("--dry-run", action="store_true")
 
     sales = subparsers.add_parser("sales", help="Run batched latest-sales ingestion")
@@ -6,7 +6,6 @@ import time
 import random
 from datetime import datetime
 
-import requests
 from bs4 import BeautifulSoup
 
 from db import (
@@ -16,7 +15,10 @@ from db import (
     sql_placeholder_list,
 )
 from populate_db import (
+    HTML_PARSER,
+    PRODUCT_WAIT_SELECTOR,
     ensure_runtime_schema,
+    build_http_session,
     fetch_page_with_retries,
     is_driver_alive,
     make_driver,
@@ -87,7 +89,7 @@ def infer_supertype(title):
 
 
 def parse_card_details(html, fallback_name="", source_url="", fallback_set_name=None):
-    soup = BeautifulSoup(html or "", "html.parser")
+    soup = BeautifulSoup(html or "", HTML_PARSER)
     h1 = soup.find("h1")
     raw_title = normalize_spaces(h1.get_text(" ", strip=True)) if h1 else fallback_name
     body_text = normalize_spaces(soup.get_text(" ", strip=True))
@@ -219,13 +221,7 @@ def main():
     configure_db_connection(conn)
     ensure_runtime_schema(conn)
 
-    session = requests.Session()
-    session.headers.update(
-        {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36",
-            "Accept-Language": "en-US,en;q=0.9",
-        }
-    )
+    session = build_http_session()
 
     driver = None
     selenium_enabled = not args.no_selenium
@@ -248,17 +244,18 @@ def main():
     failed = 0
     for card_product_id, name, url, set_name in rows:
         try:
-            html, meta = fetch_page_with_retries(
+            html, status_code, attempts, reason = fetch_page_with_retries(
+                session,
                 url,
-                session=session,
                 timeout=args.request_timeout,
                 max_retries=args.max_retries,
-                retry_backoff=args.retry_backoff,
+                base_backoff=args.retry_backoff,
             )
+            meta = {"status_code": status_code, "attempts": attempts, "reason": reason}
             if (not html or len(html) < 5000) and selenium_enabled:
                 if not is_driver_alive(driver):
                     driver = make_driver(headless=args.headless)
-                html = selenium_fetch_page(url, driver)
+                html = selenium_fetch_page(url, driver, wait_selector=PRODUCT_WAIT_SELECTOR, timeout=10)
                 meta = {"status_code": 200, "attempts": meta.get("attempts", 1), "reason": "selenium_fallback"}
 
             details = parse_card_details(
@@ -285,6 +282,7 @@ def main():
 
     conn.commit()
     conn.close()
+    session.close()
     if driver:
         try:
             driver.quit()
@@ -5,15 +5,20 @@ import pandas as pd
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 
 # --- CONFIG ---
 START_URL = "https://www.tcgplayer.com/search/pokemon/product?productLineName=pokemon&page=1&view=grid&ProductTypeName=Sealed+Products"
 OUTPUT_CSV = "products.csv"
 MAX_PAGES = 108  # Adjust if needed
+PRODUCT_CARD_SELECTOR = "a[data-testid^='product-card__image']"
+WAIT_SECONDS = 15
 
 # --- Set up headless Chrome ---
 chrome_options = Options()
+chrome_options.page_load_strategy = "none"  # don't block driver.get() on images/ads
 #chrome_options.add_argument("--headless")
 chrome_options.add_argument("--disable-gpu")
 chrome_options.add_argument("--window-size=1920,1080")
@@ -30,14 +35,19 @@ for page_num in range(1, MAX_PAGES + 1):
     print(f"Fetching page {page_num}: {url}")
     driver.get(url)
 
-    # Wait for products to load
-    time.sleep(10 + random.random())  # adjust if slow
-    print(f"✅ Page {page_num} loaded")
+    # Wait only until the product cards are in the DOM
+    try:
+        WebDriverWait(driver, WAIT_SECONDS).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, PRODUCT_CARD_SELECTOR))
+        )
+        print(f"✅ Page {page_num} loaded")
+    except TimeoutException:
+        print(f"Timed out after {WAIT_SECONDS}s waiting for products on page {page_num}")
 
 
     # Find all product cards
     try:
-        product_cards = driver.find_elements(By.CSS_SELECTOR, "a[data-testid^='product-card__image']")
+        product_cards = driver.find_elements(By.CSS_SELECTOR, PRODUCT_CARD_SELECTOR)
         if not product_cards:
             print("No products found, assuming end of catalogue.")
             break
@@ -56,7 +66,7 @@ for page_num in range(1, MAX_PAGES + 1):
         break
 
     # Random delay between pages/-
-    time.sleep(2 + random.random())
+    time.sleep(random.uniform(0.3, 0.8))
 
 # --- Save to CSV ---
 df = pd.DataFrame(all_products)
@@ -3,6 +3,11 @@
 The default backend is still SQLite, but the schema bootstrap is now written
 with backend-aware helpers so it can be moved toward Postgres later without
 rewriting every call site.
+
+Writers that load many rows (catalog imports, snapshot runs) should batch them
+with ``executemany`` inside a single transaction rather than committing per
+row; the unique partial index on ``products.url`` lets product loads use
+``INSERT ... ON CONFLICT DO NOTHING`` for dedupe.
 """
 
 import argparse
@@ -209,6 +214,17 @@ def create_schema(conn):
         """
     )
 
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS http_validators (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            updated_at TEXT NOT NULL
+        )
+        """
+    )
+
     # Backfill columns when the schema is opened against an older SQLite DB.
     cols = table_columns(conn, "listings")
     if "snapshot_date" not in cols:
@@ -260,6 +276,7 @@ def create_schema(conn):
         """
     )
     c.execute("CREATE INDEX IF NOT EXISTS idx_listings_product_source_timestamp ON listings (product_id, source, timestamp)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_listings_source_product_timestamp ON listings (source, product_id, timestamp)")
     c.execute("DROP INDEX IF EXISTS idx_listings_product_source_run")
     c.execute("CREATE INDEX IF NOT EXISTS idx_listings_product_source_snapshot_date ON listings (product_id, source, snapshot_date)")
     c.execute(
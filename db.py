@@ -79,6 +79,9 @@ def configure_connection(conn):
         cursor.execute("PRAGMA foreign_keys = ON")
         cursor.execute("PRAGMA journal_mode = WAL")
         cursor.execute("PRAGMA synchronous = NORMAL")
+        # 64 MiB page cache (negative values are KiB) for bulk ingest runs.
+        cursor.execute("PRAGMA cache_size = -65536")
+        cursor.execute("PRAGMA temp_store = MEMORY")
         conn.commit()
         return
 
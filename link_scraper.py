@@ -1,6 +1,8 @@
-"""Selenium-based TCGplayer sealed catalogue scraper with debug artifacts.
+"""TCGplayer sealed catalogue scraper with a Selenium fallback and debug artifacts.
 
-This file integrates the diagnostic behavior from `debug_open.py`:
+Search pages are fetched over plain HTTP and parsed with lxml first. Pages whose
+HTML carries no product cards fall back to Selenium, which integrates the
+diagnostic behavior from `debug_open.py`:
 - sets a desktop User-Agent
 - uses Selenium experimental options to reduce automation detection
 - waits for product elements with WebDriverWait
@@ -10,20 +12,41 @@ You can run a short test with: `python3 link_scraper.py --pages 1`
 """
 
 import csv
+import os
 import time
 import random
 import argparse
+import hashlib
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from urllib.parse import urlencode
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import InvalidSessionIdException, TimeoutException
 import traceback
 
+from create_db import create_schema
+from db import configure_connection, connect_database, sql_placeholder_list
+
+try:  # pragma: no cover - optional dependency
+    import lxml.html
+    from lxml import etree
+    from lxml.cssselect import CSSSelector
+except Exception:  # pragma: no cover
+    lxml = None
+    etree = None
+    CSSSelector = None
+
 # --- CONFIG ---
 OUTPUT_CSV = "products.csv"
 DEFAULT_MAX_PAGES = 108
@@ -33,6 +56,86 @@ CATALOG_MODES = {"fresh", "newest", "reconcile"}
 DEFAULT_CATEGORY_SLUG = "pokemon"
 DEFAULT_PRODUCT_LINE_NAME = "pokemon"
 DEFAULT_PRODUCT_TYPE_NAME = "Sealed Products"
+# Runs in the browser: same card/title/alt fallbacks as parse_search_page.
+COLLECT_CARDS_SCRIPT = """
+const [cardSelector, titleSelector] = arguments;
+let cards = Array.from(document.querySelectorAll(cardSelector));
+if (!cards.length) {
+  cards = Array.from(document.querySelectorAll("a[href*='/product/']"));
+}
+return cards.map((a) => {
+  const title = a.querySelector(titleSelector)
+    || (a.parentElement && a.parentElement.querySelector(titleSelector));
+  const img = a.querySelector("img");
+  return {url: a.href, name: (title && title.textContent.trim()) || (img && img.alt) || ""};
+});
+"""
+if CSSSelector is not None:
+    # Compile CSS -> XPath once rather than for every card on every page.
+    SEL_CARD = CSSSelector(PRODUCT_CARD_SELECTOR)
+    SEL_TITLE = CSSSelector(PRODUCT_TITLE_SELECTOR)
+    SEL_IMG = CSSSelector("img")
+    XPATH_PRODUCT_LINKS = etree.XPath("//a[contains(@href, '/product/')]")
+else:  # pragma: no cover
+    SEL_CARD = SEL_TITLE = SEL_IMG = XPATH_PRODUCT_LINKS = None
+TCGPLAYER_BASE_URL = "https://www.tcgplayer.com"
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36"
+)
+HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept-Language": "en-US,en;q=0.9",
+}
+HTTP_TIMEOUT = 10
+# Restart Chrome only after this many hard WebDriver failures in a row.
+MAX_CONSECUTIVE_DRIVER_FAILURES = 2
+DEFAULT_HTTP_WORKERS = 10
+HTTP_MAX_RETRIES = 3
+# 429/503 are rate-limit signals handled by RateLimitBackoff so every worker
+# slows down together; the adapter only retries the other transient errors.
+RETRYABLE_HTTP_STATUSES = (500, 502, 504)
+THROTTLE_HTTP_STATUSES = (429, 503)
+MAX_THROTTLE_DELAY = 60.0
+DEFAULT_CACHE_TTL_HOURS = 6.0
+# JSON endpoint behind the search grid; same products, no HTML to parse.
+SEARCH_API_URL = "https://mp-search-api.tcgplayer.com/v1/search/request"
+SEARCH_API_PAGE_SIZE = 24
+NON_SLUG_CHARS_RE = re.compile(r"[^a-z0-9]+")
+# Query params that do not change the listing content.
+VOLATILE_QUERY_PARAMS = {"utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content", "_"}
+# Chrome subsystems the crawler never uses; each one costs RAM/CPU per process.
+CHROME_LEAN_ARGS = [
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-features=TranslateUI",
+    "--disable-default-apps",
+    "--no-first-run",
+    "--disable-sync",
+    "--disable-notifications",
+    "--metrics-recording-only",
+    "--mute-audio",
+    "--aggressive-cache-discard",
+]
+# Subresources the crawler never reads; blocked in Chrome to cut page bytes.
+BLOCKED_URL_PATTERNS = [
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.gif",
+    "*.webp",
+    "*.svg",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.css",
+    "*google-analytics*",
+    "*googletagmanager*",
+    "*doubleclick*",
+]
 
 
 def log(message):
@@ -40,20 +143,19 @@ def log(message):
 
 
 def load_existing_products(output_path):
-    products = []
-    seen_urls = set()
+    """Return {url: name} for the CSV rows, keeping the first name per URL."""
+    products = {}
     if not output_path.exists():
-        return products, seen_urls
+        return products
 
     with output_path.open("r", newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
             url = (row.get("url") or "").strip()
             name = (row.get("name") or "").strip()
-            if url and url not in seen_urls:
-                products.append((name, url))
-                seen_urls.add(url)
-    return products, seen_urls
+            if url:
+                products.setdefault(url, name)
+    return products
 
 
 def build_search_url(page, category_slug=DEFAULT_CATEGORY_SLUG, product_line_name=DEFAULT_PRODUCT_LINE_NAME, product_type_name=DEFAULT_PRODUCT_TYPE_NAME):
@@ -78,6 +180,9 @@ def filter_pages_for_shard(pages, shard_index=0, shard_count=1):
 
 def make_driver(headless=False):
     opts = Options()
+    # Return from driver.get() once the document is parsed; the product-card
+    # WebDriverWait gates progress instead of images, ads and trackers.
+    opts.page_load_strategy = "none"
     if headless:
         # Use new headless when desired; by default we run non-headless for visibility
         opts.add_argument("--headless=new")
@@ -85,18 +190,451 @@ def make_driver(headless=False):
     opts.add_argument("--disable-gpu")
     opts.add_argument("--window-size=1920,1080")
     opts.add_argument("--log-level=3")
-    opts.add_argument(
-        "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36"
-    )
+    opts.add_argument(f"--user-agent={USER_AGENT}")
+    for arg in CHROME_LEAN_ARGS:
+        opts.add_argument(arg)
+    # Chrome refuses to start its sandbox as root (e.g. in containers); keep
+    # it everywhere else, since this browser loads third-party pages.
+    if hasattr(os, "geteuid") and os.geteuid() == 0:
+        opts.add_argument("--no-sandbox")
+    # Skip image downloads/decoding; product cards only need the markup.
+    opts.add_argument("--blink-settings=imagesEnabled=false")
+    opts.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
     # Try to reduce automation flags
     opts.add_experimental_option("excludeSwitches", ["enable-automation"])
     opts.add_experimental_option("useAutomationExtension", False)
 
     driver = webdriver.Chrome(options=opts)
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    except Exception as e:
+        # CDP is Chromium-only; the image prefs above still apply.
+        log(f"Could not block subresources via CDP: {e}")
     return driver
 
 
+class RateLimitBackoff:
+    def __init__(self, max_delay=MAX_THROTTLE_DELAY):
+        self.lock = threading.Lock()
+        self.max_delay = max_delay
+        self.consecutive = 0
+
+    def throttled(self, retry_after=None):
+        """Record a 429/503 and return how long to sleep before retrying."""
+        with self.lock:
+            self.consecutive += 1
+            delay = 2 ** self.consecutive
+        try:
+            delay = max(delay, float(retry_after))
+        except (TypeError, ValueError):
+            pass
+        return min(self.max_delay, delay)
+
+    def succeeded(self):
+        with self.lock:
+            self.consecutive = 0
+
+
+def build_http_session(pool_size=DEFAULT_HTTP_WORKERS):
+    """Return one keep-alive session shared by every search page request."""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    retry = Retry(
+        total=HTTP_MAX_RETRIES,
+        backoff_factor=1,
+        status_forcelist=RETRYABLE_HTTP_STATUSES,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def request_with_backoff(session, method, url, timeout=HTTP_TIMEOUT, backoff=None, max_attempts=HTTP_MAX_RETRIES + 1, **kwargs):
+    """Return the 200 response for one HTTP request, or None on failure.
+
+    Rate-limit responses (429/503) back off exponentially via `backoff`, which
+    is shared by all workers; any success resets it.
+    """
+    backoff = backoff or RateLimitBackoff()
+    for attempt in range(1, max_attempts + 1):
+        try:
+            resp = session.request(method, url, timeout=timeout, **kwargs)
+        except requests.RequestException as e:
+            log(f"HTTP fetch failed for {url}: {e}")
+            return None
+        if resp.status_code in THROTTLE_HTTP_STATUSES and attempt < max_attempts:
+            delay = backoff.throttled(resp.headers.get("Retry-After"))
+            log(f"HTTP {resp.status_code} for {url}; backing off {delay:.0f}s (attempt {attempt}/{max_attempts})")
+            time.sleep(delay)
+            continue
+        if resp.status_code != 200:
+            log(f"HTTP {resp.status_code} for {url}")
+            return None
+        backoff.succeeded()
+        return resp
+    return None
+
+
+def fetch_search_page(session, url, timeout=HTTP_TIMEOUT, backoff=None, max_attempts=HTTP_MAX_RETRIES + 1):
+    """Return search page HTML fetched over plain HTTP, or None on failure."""
+    resp = request_with_backoff(session, "GET", url, timeout=timeout, backoff=backoff, max_attempts=max_attempts)
+    return resp.text if resp is not None else None
+
+
+def build_search_api_payload(page, product_line_name=DEFAULT_PRODUCT_LINE_NAME, product_type_name=DEFAULT_PRODUCT_TYPE_NAME, size=SEARCH_API_PAGE_SIZE):
+    return {
+        "algorithm": "sales_dismax",
+        "from": (page - 1) * size,
+        "size": size,
+        "filters": {
+            "term": {
+                "productLineName": [product_line_name],
+                "productTypeName": [product_type_name],
+            },
+            "range": {},
+            "match": {},
+        },
+        "listingSearch": {"context": {"cart": {}}, "filters": {"term": {}, "range": {}, "exclude": {}}},
+        "context": {"cart": {}, "shippingCountry": "US"},
+        "sort": {},
+    }
+
+
+def search_api_product_url(item):
+    slug = "-".join(
+        part for part in (item.get("productLineUrlName"), item.get("setUrlName"), item.get("productUrlName")) if part
+    )
+    slug = NON_SLUG_CHARS_RE.sub("-", slug.lower()).strip("-")
+    return f"{TCGPLAYER_BASE_URL}/product/{int(item['productId'])}/{slug}?page=1"
+
+
+def parse_search_api_response(data):
+    """Return (name, url) tuples from a search API JSON response."""
+    try:
+        items = data["results"][0]["results"]
+    except (KeyError, IndexError, TypeError):
+        return []
+    products = []
+    for item in items or []:
+        if item.get("productId") is None:
+            continue
+        name = (item.get("productName") or "").strip() or "(unknown)"
+        products.append((name, search_api_product_url(item)))
+    return products
+
+
+def search_api_cache_key(page, product_line_name=DEFAULT_PRODUCT_LINE_NAME, product_type_name=DEFAULT_PRODUCT_TYPE_NAME):
+    """Return the URL-shaped key a search API page is cached under."""
+    query = urlencode({"page": page, "productLineName": product_line_name, "productTypeName": product_type_name})
+    return f"{SEARCH_API_URL}?{query}"
+
+
+def fetch_search_api_page(session, page, product_line_name=DEFAULT_PRODUCT_LINE_NAME, product_type_name=DEFAULT_PRODUCT_TYPE_NAME, backoff=None, cache_dir=None):
+    """Return (name, url) tuples for one page of the JSON search API.
+
+    Uses the same page size as the HTML grid so page numbers, sharding and
+    stop-on-empty behave the same on either path. When cache_dir is set, a
+    response that yields products is cached under search_api_cache_key.
+    """
+    payload = build_search_api_payload(page, product_line_name=product_line_name, product_type_name=product_type_name)
+    resp = request_with_backoff(
+        session,
+        "POST",
+        SEARCH_API_URL,
+        backoff=backoff,
+        params={"q": "", "isList": "false"},
+        json=payload,
+    )
+    if resp is None:
+        return []
+    try:
+        products = parse_search_api_response(resp.json())
+    except ValueError as e:
+        log(f"Unreadable search API response for page {page}: {e}")
+        return []
+    if products:
+        write_cached_page(
+            cache_dir, search_api_cache_key(page, product_line_name, product_type_name), resp.text, suffix=".json"
+        )
+    return products
+
+
+def parse_search_page(html):
+    """Return (name, url) tuples for every product card in search page HTML."""
+    if lxml is None:
+        raise RuntimeError("lxml_not_installed")
+    if not html or not html.strip():
+        return []
+
+    tree = lxml.html.fromstring(html)
+    cards = SEL_CARD(tree)
+    if not cards:
+        # Try broader search for links containing /product/
+        cards = XPATH_PRODUCT_LINKS(tree)
+
+    products = []
+    for card in cards:
+        href = urljoin(TCGPLAYER_BASE_URL, card.get("href") or "")
+        if "/product/" not in href:
+            continue
+        # Title span is usually a child of the card, sometimes a sibling.
+        titles = SEL_TITLE(card)
+        if not titles and card.getparent() is not None:
+            titles = SEL_TITLE(card.getparent())
+        name = titles[0].text_content().strip() if titles else ""
+        if not name:
+            images = SEL_IMG(card)
+            name = (images[0].get("alt") or "").strip() if images else ""
+        products.append((name or "(unknown)", href))
+    return products
+
+
+def normalize_cache_url(url):
+    """Return a stable cache key URL: sorted query params, volatile ones dropped."""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in VOLATILE_QUERY_PARAMS)
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(query), ""))
+
+
+def cached_page_path(cache_dir, url, suffix=".html"):
+    digest = hashlib.sha1(normalize_cache_url(url).encode("utf-8")).hexdigest()
+    return Path(cache_dir) / f"page_{digest}{suffix}"
+
+
+def read_cached_page(cache_dir, url, ttl_hours=DEFAULT_CACHE_TTL_HOURS, suffix=".html"):
+    """Return cached text for url if present and younger than ttl_hours."""
+    if not cache_dir:
+        return None
+    path = cached_page_path(cache_dir, url, suffix=suffix)
+    try:
+        if time.time() - path.stat().st_mtime > ttl_hours * 3600:
+            return None
+        return path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+def write_cached_page(cache_dir, url, html, suffix=".html"):
+    if not cache_dir or not html:
+        return
+    path = cached_page_path(cache_dir, url, suffix=suffix)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(html, encoding="utf-8")
+    except OSError as e:
+        log(f"Failed to cache {url}: {e}")
+
+
+def fetch_and_parse_page(session, url, cache_dir=None, cache_ttl_hours=DEFAULT_CACHE_TTL_HOURS, backoff=None, api_page=None, product_line_name=DEFAULT_PRODUCT_LINE_NAME, product_type_name=DEFAULT_PRODUCT_TYPE_NAME):
+    """Fetch one search page over HTTP and return its (name, url) tuples.
+
+    When api_page is set the JSON search API is tried first and the HTML page
+    is only fetched if it returns nothing. When cache_dir is set, a fresh
+    cached copy of either the API response or the HTML page is parsed before
+    any network request, and responses that yield products are written back
+    to the cache.
+    """
+    if api_page is not None:
+        cache_key = search_api_cache_key(api_page, product_line_name, product_type_name)
+        cached = read_cached_page(cache_dir, cache_key, ttl_hours=cache_ttl_hours, suffix=".json")
+        if cached:
+            try:
+                products = parse_search_api_response(json.loads(cached))
+                if products:
+                    return products
+            except ValueError as e:
+                log(f"Ignoring unreadable cache entry for {cache_key}: {e}")
+
+    cached = read_cached_page(cache_dir, url, ttl_hours=cache_ttl_hours)
+    if cached:
+        try:
+            products = parse_search_page(cached)
+            if products:
+                return products
+        except Exception as e:
+            log(f"Ignoring unreadable cache entry for {url}: {e}")
+
+    if api_page is not None:
+        time.sleep(random.uniform(0.5, 1.5))
+        products = fetch_search_api_page(
+            session,
+            api_page,
+            product_line_name=product_line_name,
+            product_type_name=product_type_name,
+            backoff=backoff,
+            cache_dir=cache_dir,
+        )
+        if products or lxml is None:
+            return products
+
+    # Jitter so concurrent workers do not hit the site in lockstep.
+    time.sleep(random.uniform(0.5, 1.5))
+    html = fetch_search_page(session, url, backoff=backoff)
+    if not html:
+        return []
+    try:
+        products = parse_search_page(html)
+    except Exception as e:
+        log(f"Error parsing HTML for {url}: {e}")
+        return []
+    if products:
+        write_cached_page(cache_dir, url, html)
+    return products
+
+
+def fetch_pages_over_http(session, urls_by_page, workers=DEFAULT_HTTP_WORKERS, cache_dir=None, cache_ttl_hours=DEFAULT_CACHE_TTL_HOURS, use_search_api=False, product_line_name=DEFAULT_PRODUCT_LINE_NAME, product_type_name=DEFAULT_PRODUCT_TYPE_NAME):
+    """Fetch and parse search pages concurrently; return {page_num: products}."""
+    results = {}
+    if not urls_by_page:
+        return results
+    backoff = RateLimitBackoff()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(
+                fetch_and_parse_page,
+                session,
+                url,
+                cache_dir,
+                cache_ttl_hours,
+                backoff,
+                page_num if use_search_api else None,
+                product_line_name,
+                product_type_name,
+            ): page_num
+            for page_num, url in urls_by_page.items()
+        }
+        for future in as_completed(futures):
+            page_num = futures[future]
+            results[page_num] = future.result()
+            log(f"HTTP page {page_num}: {len(results[page_num])} products")
+    return results
+
+
+def open_products_db(target):
+    """Connect to the catalogue database and make sure the schema exists."""
+    conn = connect_database(target)
+    configure_connection(conn)
+    create_schema(conn)
+    return conn
+
+
+def save_products_to_db(conn, rows):
+    """Insert (name, url) rows in one executemany; URLs already stored are skipped."""
+    if not rows:
+        return
+    placeholders = sql_placeholder_list(conn, 2)
+    cursor = conn.cursor()
+    # No conflict target: matches the partial unique index on products.url.
+    cursor.executemany(f"INSERT INTO products (name, url) VALUES ({placeholders}) ON CONFLICT DO NOTHING", rows)
+    conn.commit()
+
+
+def collect_products_with_script(driver):
+    """Return (name, url) tuples gathered in the browser with one execute_script call."""
+    rows = driver.execute_script(COLLECT_CARDS_SCRIPT, PRODUCT_CARD_SELECTOR, PRODUCT_TITLE_SELECTOR) or []
+    products = []
+    for row in rows:
+        href = (row.get("url") or "").strip()
+        if "/product/" in href:
+            products.append(((row.get("name") or "").strip() or "(unknown)", href))
+    return products
+
+
+def driver_session_dead(exc):
+    """True when a WebDriver error means the browser is gone and only a restart helps."""
+    if isinstance(exc, InvalidSessionIdException):
+        return True
+    msg = str(exc).lower()
+    return "invalid session id" in msg or "chrome not reachable" in msg
+
+
+def load_search_page(driver, url, page_num, retries=1, wait_time=60, page_load_timeout=60, headless=False, consecutive_failures=0):
+    """Load a search page in Chrome, retrying up to `retries` more times.
+
+    Returns (driver, last_exc, consecutive_failures); driver may be a
+    restarted browser, or None if a restart failed. last_exc is None once the
+    page loaded. Waiting out the product cards is not a hard failure: the
+    load is stopped, cookies are cleared and the page is loaded again in the
+    same browser, and only after the last attempt is the page used as it is.
+    Chrome is restarted once hard failures repeat or the session is gone.
+    """
+    last_exc = None
+    for attempt in range(0, retries + 1):
+        try:
+            # ensure reasonable page load timeout
+            try:
+                driver.set_page_load_timeout(page_load_timeout)
+            except Exception:
+                # some webdriver versions may not support setting this; ignore
+                pass
+
+            try:
+                driver.get(url)
+            except TimeoutException:
+                # With the "none" load strategy this only fires when the
+                # navigation itself stalls (no document yet); halt it and let
+                # the card wait below decide.
+                log(f"Page load exceeded {page_load_timeout}s on page {page_num}; stopping load")
+                driver.execute_script("window.stop();")
+            cards_found = True
+            try:
+                WebDriverWait(driver, wait_time).until(
+                    EC.presence_of_element_located(
+                        (By.CSS_SELECTOR, f"{PRODUCT_CARD_SELECTOR}, {PRODUCT_TITLE_SELECTOR}")
+                    )
+                )
+                log("Product elements detected")
+            except TimeoutException:
+                cards_found = False
+            # get() returned before subresources loaded; stop the ones still
+            # in flight (trackers, ads) now that the wait is over either way.
+            driver.execute_script("window.stop();")
+            if not cards_found:
+                if attempt < retries:
+                    # The browser is healthy, just slow: clear state and retry.
+                    log(
+                        f"Timed out waiting ({wait_time}s) for product elements on page {page_num} "
+                        f"(attempt {attempt+1}/{retries+1}); retrying with the same browser"
+                    )
+                    driver.delete_all_cookies()
+                    continue
+                log(f"Timed out waiting ({wait_time}s) for product elements on page {page_num}; continuing")
+
+            return driver, None, 0
+        except Exception as e:
+            last_exc = e
+            consecutive_failures += 1
+            log(f"Error loading page {page_num} (attempt {attempt+1}/{retries+1}): {e}")
+            traceback.print_exc()
+            # try to save any available page source
+            try:
+                htmlfile = f"debug_page_{page_num}_attempt{attempt+1}.html"
+                with open(htmlfile, "w", encoding="utf-8") as fh:
+                    fh.write(driver.page_source or "")
+                log(f"Saved partial page source to {htmlfile}")
+            except Exception:
+                pass
+
+            if consecutive_failures < MAX_CONSECUTIVE_DRIVER_FAILURES and not driver_session_dead(e):
+                continue
+
+            # restart driver and retry
+            consecutive_failures = 0
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            driver = None
+            try:
+                driver = make_driver(headless=headless)
+            except Exception as e2:
+                log(f"Failed to restart Chrome driver: {e2}")
+                break
+    return driver, last_exc, consecutive_failures
+
+
 def scrape_pages(
     pages,
     output_csv,
@@ -111,13 +649,20 @@ def scrape_pages(
     category_slug=DEFAULT_CATEGORY_SLUG,
     product_line_name=DEFAULT_PRODUCT_LINE_NAME,
     product_type_name=DEFAULT_PRODUCT_TYPE_NAME,
+    http_workers=DEFAULT_HTTP_WORKERS,
+    cache_dir=None,
+    cache_ttl_hours=DEFAULT_CACHE_TTL_HOURS,
+    use_search_api=True,
+    db_target=None,
 ):
     driver = None
-    all_products = []
-    seen_urls = set()
+    consecutive_failures = 0
+    # url -> name; dicts keep insertion order, so this is both the dedupe
+    # index and the output order.
+    all_products = {}
     output_path = Path(output_csv)
-    existing_products = []
-    existing_urls = set()
+    existing_products = {}
+    existing_loaded = False
 
     if mode not in CATALOG_MODES:
         raise ValueError(f"Unsupported catalog mode: {mode}")
@@ -132,182 +677,146 @@ def scrape_pages(
 
     if mode in {"newest", "reconcile"} and output_path.exists():
         try:
-            existing_products, existing_urls = load_existing_products(output_path)
+            existing_products = load_existing_products(output_path)
             log(f"Loaded {len(existing_products)} existing products from {output_csv}")
             if mode == "newest":
-                all_products = list(existing_products)
-                seen_urls = set(existing_urls)
+                all_products = dict(existing_products)
+            existing_loaded = True
         except Exception as e:
             log(f"Failed to read existing CSV for {mode}: {e}")
 
-    try:
-        log("Starting Chrome...")
-        driver = make_driver(headless=headless)
+    # Stream rows into the CSV as pages complete. "newest" appends to the
+    # existing file; the other modes start a fresh file.
+    append = mode == "newest" and existing_loaded
+    needs_header = not append or output_path.stat().st_size == 0
+    out_fh = output_path.open("a" if append else "w", newline="", encoding="utf-8")
+    writer = csv.writer(out_fh)
+    if needs_header:
+        writer.writerow(["name", "url"])
+        out_fh.flush()
+
+    urls_by_page = {
+        page_num: build_search_url(
+            page_num,
+            category_slug=category_slug,
+            product_line_name=product_line_name,
+            product_type_name=product_type_name,
+        )
+        for page_num in worker_pages
+    }
+    session = build_http_session(pool_size=max(1, http_workers))
+    http_results = {}
+    db_conn = open_products_db(db_target) if db_target else None
 
-        for page_num in worker_pages:
-            url = build_search_url(
-                page_num,
-                category_slug=category_slug,
+    try:
+        if lxml is None and not use_search_api:
+            log("lxml is not installed; using Selenium for every page.")
+        else:
+            log(f"Fetching {len(urls_by_page)} pages over HTTP with {http_workers} workers...")
+            http_results = fetch_pages_over_http(
+                session,
+                urls_by_page,
+                workers=http_workers,
+                cache_dir=cache_dir,
+                cache_ttl_hours=cache_ttl_hours,
+                use_search_api=use_search_api,
                 product_line_name=product_line_name,
                 product_type_name=product_type_name,
             )
+
+        for page_num in worker_pages:
+            url = urls_by_page[page_num]
             log(f"Opening page {page_num}: {url}")
 
-            # Attempt to load the page with retries; restart driver on failure.
-            page_source = None
-            last_exc = None
-            for attempt in range(0, retries + 1):
+            page_products = http_results.get(page_num) or []
+            if lxml is not None or use_search_api:
+                if page_products:
+                    log(f"Found {len(page_products)} products over HTTP")
+                else:
+                    log(f"No product cards in HTTP response for page {page_num}; falling back to Selenium")
+
+            if not page_products:
+                if driver is None:
+                    log("Starting Chrome...")
+                    driver = make_driver(headless=headless)
+
+                driver, last_exc, consecutive_failures = load_search_page(
+                    driver,
+                    url,
+                    page_num,
+                    retries=retries,
+                    wait_time=wait_time,
+                    page_load_timeout=page_load_timeout,
+                    headless=headless,
+                    consecutive_failures=consecutive_failures,
+                )
+                if last_exc:
+                    log(f"Giving up on page {page_num} after {retries+1} attempts: {last_exc}")
+                    continue
+
+                # Collect product cards in one script round-trip; parse the
+                # page source locally if the script comes back empty.
                 try:
-                    # ensure reasonable page load timeout
-                    try:
-                        driver.set_page_load_timeout(page_load_timeout)
-                    except Exception:
-                        # some webdriver versions may not support setting this; ignore
-                        pass
-
-                    driver.get(url)
-                    try:
-                        WebDriverWait(driver, wait_time).until(
-                            EC.presence_of_element_located(
-                                (By.CSS_SELECTOR, f"{PRODUCT_CARD_SELECTOR}, {PRODUCT_TITLE_SELECTOR}")
-                            )
-                        )
-                        log("Product elements detected")
-                    except TimeoutException:
-                        log(f"Timed out waiting ({wait_time}s) for product elements on page {page_num}; continuing")
-
-                    page_source = driver.page_source
-                    last_exc = None
-                    break
+                    page_products = collect_products_with_script(driver)
                 except Exception as e:
-                    last_exc = e
-                    log(f"Error loading page {page_num} (attempt {attempt+1}/{retries+1}): {e}")
-                    traceback.print_exc()
-                    # try to save any available page source
-                    try:
-                        htmlfile = f"debug_page_{page_num}_attempt{attempt+1}.html"
-                        with open(htmlfile, "w", encoding="utf-8") as fh:
-                            fh.write(driver.page_source or "")
-                        log(f"Saved partial page source to {htmlfile}")
-                    except Exception:
-                        pass
-
-                    # restart driver and retry
-                    try:
-                        driver.quit()
-                    except Exception:
-                        pass
-                    try:
-                        driver = make_driver(headless=headless)
-                    except Exception as e2:
-                        log(f"Failed to restart Chrome driver: {e2}")
-                        break
-
-            if last_exc:
-                log(f"Giving up on page {page_num} after {retries+1} attempts: {last_exc}")
-                # persist progress and continue
+                    log(f"Card script failed on page {page_num}: {e}")
                 try:
-                    with output_path.open("w", newline="", encoding="utf-8") as f:
-                        writer = csv.writer(f)
-                        writer.writerow(["name", "url"])
-                        writer.writerows(all_products)
-                    log(f"Progress saved: {len(all_products)} products so far")
+                    if not page_products and lxml is not None:
+                        page_products = parse_search_page(driver.page_source)
+                    if page_products and cache_dir:
+                        write_cached_page(cache_dir, url, driver.page_source)
                 except Exception as e:
-                    log(f"Failed to save interim CSV: {e}")
-                continue
-
-            # Collect product cards
-            try:
-                product_cards = driver.find_elements(By.CSS_SELECTOR, PRODUCT_CARD_SELECTOR)
-                if not product_cards:
-                    # Try broader search for links containing /product/
-                    product_cards = [e for e in driver.find_elements(By.TAG_NAME, "a") if "/product/" in (e.get_attribute("href") or "")]
-
-                if not product_cards:
-                    log(f"No products found on page {page_num}")
-                    if stop_on_empty:
-                        log("stop_on_empty enabled - stopping iteration")
-                        break
-                else:
-                    for card in product_cards:
-                        try:
-                            href = card.get_attribute("href")
-                            name = ""
-                            # Try to find the product name in several ways
-                            try:
-                                # 1. Direct child span
-                                title_elem = card.find_element(By.CSS_SELECTOR, PRODUCT_TITLE_SELECTOR)
-                                name = title_elem.text.strip()
-                            except Exception:
-                                pass
-                            if not name:
-                                try:
-                                    # 2. Sibling span (sometimes not a child)
-                                    parent = card.find_element(By.XPATH, "..")
-                                    sib_title = parent.find_element(By.CSS_SELECTOR, PRODUCT_TITLE_SELECTOR)
-                                    name = sib_title.text.strip()
-                                except Exception:
-                                    pass
-                            if not name:
-                                try:
-                                    # 3. Alt text of product image
-                                    img = card.find_element(By.CSS_SELECTOR, "img")
-                                    name = img.get_attribute("alt") or ""
-                                except Exception:
-                                    pass
-                            if not name:
-                                name = "(unknown)"
-                            if href and "/product/" in href and href not in seen_urls:
-                                all_products.append((name, href))
-                                seen_urls.add(href)
-                        except Exception:
-                            continue
-
-            except Exception as e:
-                log(f"Error parsing products on page {page_num}: {e}")
-
-            # polite delay
-            time.sleep(2 + random.random() * 3)
-
-            # Persist progress after each page so long runs can be resumed
+                    log(f"Error parsing products on page {page_num}: {e}")
+
+                # short polite delay between browser page loads
+                time.sleep(random.uniform(0.5, 1.5))
+
+            if not page_products:
+                log(f"No products found on page {page_num}")
+                if stop_on_empty:
+                    log("stop_on_empty enabled - stopping iteration")
+            new_rows = []
+            for name, href in page_products:
+                if href not in all_products:
+                    all_products[href] = name
+                    new_rows.append((name, href))
+
+            # Append this page's new rows so long runs can be resumed
             try:
-                with output_path.open("w", newline="", encoding="utf-8") as f:
-                    writer = csv.writer(f)
-                    writer.writerow(["name", "url"])
-                    writer.writerows(all_products)
+                writer.writerows(new_rows)
+                out_fh.flush()
                 log(f"Progress saved: {len(all_products)} products so far")
             except Exception as e:
                 log(f"Failed to save interim CSV: {e}")
+            if db_conn is not None:
+                try:
+                    save_products_to_db(db_conn, new_rows)
+                except Exception as e:
+                    db_conn.rollback()
+                    log(f"Failed to save page {page_num} products to {db_target}: {e}")
 
-            # If stop_on_empty triggered a break from inner loop, break outer loop too
-            if stop_on_empty and not product_cards:
+            if stop_on_empty and not page_products:
                 break
 
     finally:
         if driver:
             driver.quit()
+        session.close()
+        out_fh.close()
+        if db_conn is not None:
+            db_conn.close()
 
-    # Save CSV
-    try:
-        if mode == "reconcile":
-            live_urls = {url for _, url in all_products}
-            added = [product for product in all_products if product[1] not in existing_urls]
-            removed = [product for product in existing_products if product[1] not in live_urls]
-            log(
-                f"Reconcile summary: {len(added)} added, {len(removed)} removed, {len(all_products)} current live products"
-            )
-
-        with output_path.open("w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["name", "url"])
-            writer.writerows(all_products)
-        log(f"Saved {len(all_products)} products to {output_csv}")
-    except Exception as e:
-        log(f"Failed to write CSV: {e}")
+    if mode == "reconcile":
+        added = [url for url in all_products if url not in existing_products]
+        removed = [url for url in existing_products if url not in all_products]
+        log(
+            f"Reconcile summary: {len(added)} added, {len(removed)} removed, {len(all_products)} current live products"
+        )
+    log(f"Saved {len(all_products)} products to {output_csv}")
 
 
 def main():
-    parser = argparse.ArgumentParser(description="Selenium TCGplayer sealed products scraper (debug-enabled)")
+    parser = argparse.ArgumentParser(description="TCGplayer sealed products scraper with Selenium fallback (debug-enabled)")
     parser.add_argument("--pages", type=int, default=1, help="Number of pages to fetch (default: 1 for quick test)")
     parser.add_argument("--all", action="store_true", help="Scrape all pages (uses DEFAULT_MAX_PAGES)")
     parser.add_argument("--stop-on-empty", action="store_true", help="Stop early if a page contains no products")
@@ -316,6 +825,11 @@ def main():
     parser.add_argument("--wait-time", type=int, default=20, help="Seconds to wait for product cards to appear")
     parser.add_argument("--page-load-timeout", type=int, default=25, help="Seconds to wait for the page load itself")
     parser.add_argument("--retries", type=int, default=1, help="Retry count per page after driver/page failures")
+    parser.add_argument("--http-workers", type=int, default=DEFAULT_HTTP_WORKERS, help="Concurrent HTTP fetches for search pages")
+    parser.add_argument("--cache-dir", default="", help="Reuse search page HTML cached in this directory (disabled when empty)")
+    parser.add_argument("--cache-ttl-hours", type=float, default=DEFAULT_CACHE_TTL_HOURS, help="Max age of cached search pages")
+    parser.add_argument("--db", default="", help="Also insert new products into this SQLite path or postgres:// DSN (disabled when empty)")
+    parser.add_argument("--no-search-api", action="store_true", help="Skip the JSON search API and read the HTML search pages")
     parser.add_argument("--mode", choices=sorted(CATALOG_MODES), default="fresh", help="Catalog refresh mode")
     parser.add_argument("--resume", action="store_true", help="Deprecated alias for --mode newest")
     parser.add_argument("--shard-index", type=int, default=0, help="Zero-based shard index for parallel batch workers")
@@ -341,6 +855,11 @@ def main():
         category_slug=args.category_slug,
         product_line_name=args.product_line_name,
         product_type_name=args.product_type_name,
+        http_workers=args.http_workers,
+        cache_dir=args.cache_dir or None,
+        cache_ttl_hours=args.cache_ttl_hours,
+        use_search_api=not args.no_search_api,
+        db_target=args.db or None,
     )
 
 
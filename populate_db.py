@@ -12,6 +12,7 @@ Behavior:
 """
 import csv
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 import argparse
 import time
@@ -20,6 +21,9 @@ import os
 import json
 import re
 import hashlib
+import sqlite3
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 import sys
 
@@ -40,6 +44,91 @@ DEFAULT_DB = "sealed_market.db"
 RETRYABLE_HTTP_STATUSES = {429, 500, 502, 503, 504}
 NON_RETRYABLE_HTTP_STATUSES = {400, 401, 403, 404, 410}
 DEFAULT_COMMIT_EVERY = 25
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+HTTP_POOL_SIZE = 16
+# Product pages are a few hundred KB; anything past this is not a product page.
+MAX_PAGE_BYTES = 5 * 1024 * 1024
+
+try:  # pragma: no cover - optional dependency
+    import lxml  # noqa: F401
+
+    # libxml2 builds the soup several times faster than the pure-Python parser.
+    HTML_PARSER = "lxml"
+except Exception:  # pragma: no cover
+    HTML_PARSER = "html.parser"
+
+try:  # pragma: no cover - optional dependency
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
+try:  # pragma: no cover - optional dependency
+    import lxml.html as lxml_html
+    from lxml.cssselect import CSSSelector
+except Exception:  # pragma: no cover
+    lxml_html = None
+    CSSSelector = None
+
+# Patterns and selectors used by parse_tcgplayer on every product page.
+LISTINGS_RE = re.compile(r"(\d{1,6})\s+listings", re.I)
+JSON_OBJ_RE = re.compile(r"(\{.*\})", re.S)
+NUMBER_RE = re.compile(r"(\d+(?:\.\d+)?)")
+# Raw-HTML forms of the visible-text fallbacks: words may be split by
+# whitespace, &nbsp; or intervening tags, as they are in rendered markup.
+_GAP = r"(?:\s|&nbsp;|&#160;|<[^>]*>)"
+LISTINGS_HTML_RE = re.compile(rf"(\d{{1,6}}){_GAP}+listings", re.I)
+CURRENT_QUANTITY_RE = re.compile(rf"Current{_GAP}+Quantity{_GAP}*:?{_GAP}*(\d{{1,6}})", re.I)
+CURRENT_SELLERS_RE = re.compile(rf"Current{_GAP}+Sellers{_GAP}*:?{_GAP}*(\d{{1,6}})", re.I)
+JSONLD_SCRIPT_RE = re.compile(
+    r"<script\b[^>]*\btype\s*=\s*[\"']?(?-i:application/ld\+json)[\"']?[^>]*>(.*?)</script\s*>",
+    re.S | re.I,
+)
+HTML_COMMENT_RE = re.compile(r"<!--.*?-->", re.S)
+# Comments, script/style blocks and tags (with their attribute values): none
+# of it is visible text, so the text fallbacks must not match inside it.
+NON_TEXT_HTML_RE = re.compile(r"<!--.*?-->|<(script|style)\b[^>]*>.*?</\1\s*>|<[^>]*>", re.S | re.I)
+# Markup only the DOM passes and text fallbacks of parse_tcgplayer read; its
+# presence disables the JSON-LD fast path. The label gap reuses _GAP (plus
+# comments, which the text fallback drops) so it covers every spelling
+# CURRENT_QUANTITY_RE / CURRENT_SELLERS_RE accept.
+DOM_ONLY_MARKERS_RE = re.compile(
+    rf"lblProductDetailsSetName|price-points|spotlight__shipping|Current(?:{_GAP}|<!--.*?-->)*(?:Quantity|Sellers)",
+    re.S | re.I,
+)
+# Any of these means the product's price data has rendered.
+PRODUCT_WAIT_SELECTOR = ".price-points__upper__price, li.listing-item, span.price-point__data"
+HTML_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title\s*>", re.S | re.I)
+TCGPLAYER_SHELL_TITLE = "Your Trusted Marketplace for Collectible Trading Card Games - TCGplayer"
+SET_NAME_SELECTOR = 'span[data-testid="lblProductDetailsSetName"]'
+MARKET_PRICE_HEADER_SELECTOR = ".price-points__upper__header__title, .price-points__upper__price"
+MARKET_PRICE_SELECTOR = ".price-points__upper__price"
+PRICE_POINT_ROW_SELECTOR = ".price-points__lower tr"
+PRICE_POINT_LABEL_SELECTOR = "span.text"
+PRICE_POINT_VALUE_SELECTOR = "span.price-points__lower__price"
+PRICE_CANDIDATE_SELECTOR = "span.price-point__data, span.price, div.price, span[itemprop=price]"
+SHIPPING_SELECTOR = ".spotlight__shipping"
+# Everything parse_tcgplayer reads from the DOM, matched in a single walk.
+PARSE_WALK_SELECTOR = ", ".join(
+    (
+        SET_NAME_SELECTOR,
+        MARKET_PRICE_HEADER_SELECTOR,
+        PRICE_POINT_ROW_SELECTOR,
+        PRICE_CANDIDATE_SELECTOR,
+        SHIPPING_SELECTOR,
+    )
+)
+# Opt-in specialized parser for the current TCGplayer product layout.
+FAST_PARSE_ENABLED = os.getenv("TCGPLAYER_FAST_PARSE", "").strip().lower() in ("1", "true", "yes")
+if CSSSelector is not None:
+    FAST_SET_NAME = CSSSelector(SET_NAME_SELECTOR, translator="html")
+    FAST_MARKET_PRICE = CSSSelector(MARKET_PRICE_SELECTOR, translator="html")
+    FAST_PRICE_POINT_ROWS = CSSSelector(PRICE_POINT_ROW_SELECTOR, translator="html")
+    FAST_PRICE_POINT_LABELS = CSSSelector(PRICE_POINT_LABEL_SELECTOR, translator="html")
+    FAST_PRICE_POINT_VALUES = CSSSelector(PRICE_POINT_VALUE_SELECTOR, translator="html")
+    FAST_SHIPPING = CSSSelector(SHIPPING_SELECTOR, translator="html")
 DEBUG = False
 
 
@@ -279,6 +368,16 @@ def ensure_runtime_schema(conn):
         )
         """
     )
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS http_validators (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            updated_at TEXT NOT NULL
+        )
+        """
+    )
     c.execute(
         """
         DELETE FROM listings
@@ -299,7 +398,11 @@ def ensure_runtime_schema(conn):
     )
     c.execute("DROP INDEX IF EXISTS idx_listings_product_source_run")
     c.execute("CREATE INDEX IF NOT EXISTS idx_listings_run_id ON listings (run_id)")
+    # Plain url index: lookups bind url as a parameter, which SQLite cannot
+    # match against the partial unique index's WHERE clause.
+    c.execute("CREATE INDEX IF NOT EXISTS idx_products_url ON products (url)")
     c.execute("CREATE INDEX IF NOT EXISTS idx_listings_product_source_snapshot_date ON listings (product_id, source, snapshot_date)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_listings_source_product_timestamp ON listings (source, product_id, timestamp)")
     c.execute("CREATE INDEX IF NOT EXISTS idx_scrape_failures_run ON scrape_failures (run_id, stage, reason)")
     c.execute("CREATE INDEX IF NOT EXISTS idx_sales_product_sale_date ON sales (product_id, sale_date)")
     c.execute("CREATE INDEX IF NOT EXISTS idx_card_sales_product_sale_date ON card_sales (card_product_id, sale_date)")
@@ -397,10 +500,7 @@ def finalize_scrape_run(conn, run_id, status, attempted, processed, failed, pars
 def record_failure(conn, run_id, product_name, url, stage, reason, http_status=None, attempts=None):
     c = conn.cursor()
     c.execute(
-        """
-        INSERT INTO scrape_failures (run_id, product_name, url, stage, reason, http_status, attempts, created_at)
-        VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})
-        """.format(ph="%s" if get_dialect(conn) == "postgres" else "?"),
+        dialect_sql(conn, INSERT_FAILURE_SQL),
         (
             run_id,
             product_name,
@@ -456,7 +556,7 @@ def parse_money(text):
     cleaned = str(text).strip().replace("$", "").replace(",", "")
     if not cleaned:
         return None
-    m = re.search(r"(\d+(?:\.\d+)?)", cleaned)
+    m = NUMBER_RE.search(cleaned)
     if not m:
         return None
     try:
@@ -471,7 +571,7 @@ def parse_integer(text):
     cleaned = str(text).strip().replace(",", "")
     if not cleaned:
         return None
-    m = re.search(r"(\d+(?:\.\d+)?)", cleaned)
+    m = NUMBER_RE.search(cleaned)
     if not m:
         return None
     try:
@@ -480,49 +580,180 @@ def parse_integer(text):
         return None
 
 
+# (label text, value parser, result field, which value span) for each
+# price-points__lower row. A row labelled "Current Quantity / Current
+# Sellers" carries both numbers, sellers last.
+PRICE_POINT_ROW_FIELDS = (
+    ("listed median", parse_money, "listed_median", 0),
+    ("current quantity", parse_integer, "current_quantity", 0),
+    ("current sellers", parse_integer, "current_sellers", -1),
+)
+
+
+def html_looks_like_tcgplayer_shell(source, title=None):
+    """Detect TCGplayer's generic shell/challenge markup before product data hydrates.
+
+    title defaults to the document's <title>.
+    """
+    source = source or ""
+    if title is None:
+        m = HTML_TITLE_RE.search(source)
+        title = m.group(1) if m else ""
+    if title.strip() == TCGPLAYER_SHELL_TITLE:
+        return True
+    return len(source) < 50000 and "product-details__listings" not in source and "price-points__upper__price" not in source
+
+
 def page_looks_like_tcgplayer_shell(driver):
     """Detect TCGplayer's generic shell/challenge page before product data hydrates."""
     try:
-        title = (driver.title or "").strip()
+        title = driver.title or ""
     except Exception:
         title = ""
 
-    if title == "Your Trusted Marketplace for Collectible Trading Card Games - TCGplayer":
-        return True
-
     try:
         source = driver.page_source or ""
     except Exception:
         source = ""
 
-    if len(source) < 50000 and "product-details__listings" not in source and "price-points__upper__price" not in source:
-        return True
-    return False
+    return html_looks_like_tcgplayer_shell(source, title=title)
+
+
+def build_http_session(headers=None, pool_size=HTTP_POOL_SIZE):
+    """Return a keep-alive session so product fetches reuse TLS connections.
+
+    The adapter does not retry on its own; fetch_page_with_retries owns the
+    retry/backoff policy and reports attempts and reasons.
+    """
+    session = requests.Session()
+    session.headers.update(headers or DEFAULT_HEADERS)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def row_name_url(row):
+    name = (row.get("name") or row.get("title") or "").strip()
+    url = (row.get("url") or row.get("link") or "").strip()
+    return name, url
+
 
+def prefetch_pages(session, rows, workers, delay_min, delay_max, parse_pool=None, validators=None, **fetch_kwargs):
+    """Yield (row, fetch_result, parsed) in input order with up to `workers` fetches in flight.
 
-def fetch_page_with_retries(session, url, headers, timeout=12, max_retries=3, base_backoff=1.25):
-    """Return (html, status_code, attempts, reason)."""
+    Each worker sleeps the politeness delay after its own request, so every
+    worker keeps the single-fetch pacing. With parse_pool, fetched HTML is
+    parsed in that process pool while other fetches continue; otherwise
+    parsed is None. Rows without a URL yield (row, None, None). validators
+    maps url -> validators dict for conditional GETs (see
+    fetch_page_with_retries).
+    """
+    def fetch(url):
+        try:
+            page_validators = validators.setdefault(url, {}) if validators is not None else None
+            result = fetch_page_with_retries(session, url, validators=page_validators, **fetch_kwargs)
+            parsed = None
+            if parse_pool is not None and result[0]:
+                try:
+                    parsed = parse_pool.submit(parse_tcgplayer, result[0]).result()
+                except Exception as e:
+                    debug_log(f"[DEBUG] Parse worker failed for {url}: {summarize_exception(e)}")
+            return result, parsed
+        finally:
+            time.sleep(random.uniform(delay_min, delay_max))
+
+    pending = deque()
+    row_iter = iter(rows)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        def submit_next():
+            for row in row_iter:
+                _, url = row_name_url(row)
+                pending.append((row, executor.submit(fetch, url) if url else None))
+                return
+
+        try:
+            # Keep a bounded window queued so workers never idle between rows;
+            # with one worker this is a two-deep fetch-ahead queue.
+            for _ in range(workers * 2):
+                submit_next()
+            while pending:
+                row, future = pending.popleft()
+                submit_next()
+                if future is None:
+                    yield row, None, None
+                else:
+                    yield (row, *future.result())
+        finally:
+            for _, future in pending:
+                if future:
+                    future.cancel()
+
+
+def read_capped_text(resp, max_bytes=MAX_PAGE_BYTES, chunk_size=65536):
+    """Return the streamed response body as text, truncated at max_bytes."""
+    chunks = []
+    size = 0
+    for chunk in resp.iter_content(chunk_size=chunk_size):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= max_bytes:
+            debug_log(f"[DEBUG] fetch_page: body exceeded {max_bytes} bytes; truncating")
+            break
+    return b"".join(chunks)[:max_bytes].decode(resp.encoding or "utf-8", errors="replace")
+
+
+def fetch_page_with_retries(session, url, headers=None, timeout=12, max_retries=3, base_backoff=1.25, validators=None):
+    """Return (html, status_code, attempts, reason).
+
+    headers only needs passing for per-request overrides; the session
+    defaults from build_http_session already apply.
+
+    validators, when given, is a dict with the page's last "etag" and
+    "last_modified". They are sent as a conditional GET; an unchanged page
+    returns (None, 304, attempts, "not_modified"). On a 200 the dict is
+    updated in place with the response's validators.
+    """
     attempts = 0
     last_reason = "unknown_error"
     last_status = None
+    if validators:
+        headers = dict(headers or {})
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
 
     while attempts < max_retries:
         attempts += 1
         try:
             debug_log(f"[DEBUG] fetch_page: GET {url} (attempt {attempts}/{max_retries})")
-            resp = session.get(url, headers=headers, timeout=timeout)
-            last_status = resp.status_code
-            debug_log(f"[DEBUG] fetch_page: Status {resp.status_code}, Length {len(resp.text)}")
-
-            if resp.status_code in NON_RETRYABLE_HTTP_STATUSES:
-                return None, resp.status_code, attempts, f"http_{resp.status_code}_non_retryable"
-
-            if resp.status_code in RETRYABLE_HTTP_STATUSES:
-                last_reason = f"http_{resp.status_code}_retryable"
-            elif 200 <= resp.status_code < 300:
-                return resp.text, resp.status_code, attempts, "ok"
-            else:
-                last_reason = f"http_{resp.status_code}"
+            # Stream the body so an oversized response is cut off at
+            # MAX_PAGE_BYTES instead of being buffered whole.
+            resp = session.get(url, headers=headers, timeout=timeout, stream=True)
+            try:
+                last_status = resp.status_code
+                debug_log(f"[DEBUG] fetch_page: Status {resp.status_code}")
+
+                if resp.status_code == 304 and validators:
+                    return None, resp.status_code, attempts, "not_modified"
+
+                if resp.status_code in NON_RETRYABLE_HTTP_STATUSES:
+                    return None, resp.status_code, attempts, f"http_{resp.status_code}_non_retryable"
+
+                if resp.status_code in RETRYABLE_HTTP_STATUSES:
+                    last_reason = f"http_{resp.status_code}_retryable"
+                elif 200 <= resp.status_code < 300:
+                    html = read_capped_text(resp)
+                    debug_log(f"[DEBUG] fetch_page: Length {len(html)}")
+                    if validators is not None:
+                        validators["etag"] = resp.headers.get("ETag")
+                        validators["last_modified"] = resp.headers.get("Last-Modified")
+                    return html, resp.status_code, attempts, "ok"
+                else:
+                    last_reason = f"http_{resp.status_code}"
+            finally:
+                resp.close()
 
         except requests.exceptions.Timeout:
             last_reason = "timeout"
@@ -542,10 +773,12 @@ def fetch_page_with_retries(session, url, headers, timeout=12, max_retries=3, ba
     return None, last_status, attempts, last_reason
 
 
-def make_driver(headless=True):
+def make_driver(headless=True, disk_cache_dir=None):
     """Create a Chrome WebDriver with modest anti-detection flags.
 
-    Returns a webdriver.Chrome instance or raises.
+    disk_cache_dir keeps Chrome's HTTP cache on disk so static assets are
+    not re-downloaded across product pages. Returns a webdriver.Chrome
+    instance or raises.
     """
     opts = Options()
     if headless:
@@ -558,6 +791,10 @@ def make_driver(headless=True):
         "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
         "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36"
     )
+    # Price data is text; skip image downloads and decoding.
+    opts.add_argument("--blink-settings=imagesEnabled=false")
+    if disk_cache_dir:
+        opts.add_argument(f"--disk-cache-dir={disk_cache_dir}")
     opts.add_experimental_option("excludeSwitches", ["enable-automation"])
     opts.add_experimental_option("useAutomationExtension", False)
     driver = webdriver.Chrome(options=opts)
@@ -567,7 +804,8 @@ def make_driver(headless=True):
 def selenium_fetch_page(url, driver, wait_selector=None, timeout=12, shell_grace_period=20, shell_poll_interval=2.0):
     """Render the URL in Selenium and return page_source.
 
-    If wait_selector is provided, wait up to `timeout` seconds for it.
+    If wait_selector is provided, wait up to `timeout` seconds for it;
+    without one the source is returned as soon as the page has loaded.
     Returns page_source or None on failure.
     """
     try:
@@ -610,47 +848,42 @@ def selenium_fetch_page(url, driver, wait_selector=None, timeout=12, shell_grace
                     debug_log(f"[DEBUG] selenium_fetch_page: Shell grace period expired after {shell_grace_period}s")
             return driver.page_source
 
-    # short sleep to let additional async load happen (kept small)
-    time.sleep(1.0)
     page_source = driver.page_source
     debug_log(f"[DEBUG] selenium_fetch_page: Got page_source, length {len(page_source)}")
     return page_source
 
 
-def parse_tcgplayer(html):
-    """Return dict with extracted fields: listing_count, lowest_price, lowest_shipping, lowest_total_price, market_price, listed_median, current_quantity, current_sellers, set_name.
-    This uses simple heuristics and may need tweaks for page changes.
+def load_json(text):
+    """json.loads, through orjson when it is installed.
+
+    orjson is stricter (it rejects NaN/Infinity, for one), so anything it
+    refuses is retried with the standard library to keep the same results.
+    orjson also rejects str subclasses such as bs4's Script strings, so text
+    is converted to a plain str first.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    if orjson is not None:
+        try:
+            return orjson.loads(str(text) if isinstance(text, str) else text)
+        except Exception:
+            pass
+    return json.loads(text)
+
+
+def parse_jsonld_scripts(script_texts):
+    """Return (listing_count, lowest_price, lowest_shipping) from JSON-LD script bodies."""
     listing_count = None
     lowest_price = None
     lowest_shipping = None
-    lowest_total_price = None
-    market_price = None
-    listed_median = None
-    current_quantity = None
-    current_sellers = None
-    set_name = None
-
-    # Extract set name from span[data-testid="lblProductDetailsSetName"]
     try:
-        set_span = soup.select_one('span[data-testid="lblProductDetailsSetName"]')
-        if set_span:
-            set_name = set_span.get_text(strip=True)
-    except Exception:
-        pass
-
-    # 1) Try JSON-LD <script type="application/ld+json"> — often contains offers.price
-    try:
-        for s in soup.find_all("script", type="application/ld+json"):
+        for text in script_texts:
             try:
-                payload = json.loads(s.string or "{}")
+                payload = load_json(text or "{}")
             except Exception:
-                txt = (s.string or "").strip()
-                m = re.search(r"(\{.*\})", txt, re.S)
+                txt = (text or "").strip()
+                m = JSON_OBJ_RE.search(txt)
                 if m:
                     try:
-                        payload = json.loads(m.group(1))
+                        payload = load_json(m.group(1))
                     except Exception:
                         payload = None
                 else:
@@ -689,7 +922,7 @@ def parse_tcgplayer(html):
             if isinstance(payload, dict):
                 desc = payload.get("description") or payload.get("name")
             if desc and listing_count is None:
-                m = re.search(r"(\d{1,6})\s+listings", desc, re.I)
+                m = LISTINGS_RE.search(desc)
                 if m:
                     try:
                         listing_count = int(m.group(1))
@@ -700,13 +933,182 @@ def parse_tcgplayer(html):
                 break
     except Exception:
         pass
+    return listing_count, lowest_price, lowest_shipping
+
+
+def parse_tcgplayer_jsonld_only(html):
+    """Fast path: read JSON-LD straight from the raw HTML, without a DOM.
+
+    Returns the parse_tcgplayer result only when it is guaranteed to match the
+    full parse: JSON-LD gave both price and listing count, and none of the
+    markup the DOM passes read (set name, price guide, shipping spotlight,
+    current quantity/sellers text) is present. Otherwise returns None.
+    """
+    if not html or DOM_ONLY_MARKERS_RE.search(html):
+        return None
+    scripts = [m.group(1) for m in JSONLD_SCRIPT_RE.finditer(html)]
+    if not scripts:
+        return None
+    # A commented-out block is invisible to the DOM parser; bail if any
+    # JSON-LD match depends on comment content.
+    if "<!--" in html and scripts != [m.group(1) for m in JSONLD_SCRIPT_RE.finditer(HTML_COMMENT_RE.sub("", html))]:
+        return None
+    listing_count, lowest_price, lowest_shipping = parse_jsonld_scripts(scripts)
+    if listing_count is None or lowest_price is None:
+        return None
+    return {
+        "listing_count": listing_count,
+        "lowest_price": lowest_price,
+        "lowest_shipping": lowest_shipping,
+        "lowest_total_price": round(lowest_price + (lowest_shipping or 0.0), 2),
+        "market_price": None,
+        "listed_median": None,
+        "current_quantity": None,
+        "current_sellers": None,
+        "set_name": None,
+    }
+
+
+def parse_tcgplayer_fast(html):
+    """Specialized parse for the stable TCGplayer product layout.
+
+    Reads only the set name span, the upper market price, the lower price-point
+    rows, the shipping spotlight and the JSON-LD scripts, with selectors
+    compiled once at import. Returns None when lxml is unavailable or the
+    result would fail has_minimum_parse_data, so the caller falls back to the
+    generic parser and its og:description / price-candidate fallbacks.
+    """
+    if lxml_html is None or CSSSelector is None or not html:
+        return None
+    try:
+        root = lxml_html.fromstring(html)
+    except Exception:
+        return None
+
+    def text_of(el, sep=""):
+        return sep.join(t.strip() for t in el.itertext() if t.strip())
+
+    set_name = None
+    market_price = None
+    dom_shipping = None
+    row_fields = {}
+    try:
+        found = FAST_SET_NAME(root)
+        if found:
+            set_name = text_of(found[0]) or None
+        found = FAST_MARKET_PRICE(root)
+        if found:
+            market_price = parse_money(text_of(found[0]))
+        for row in FAST_PRICE_POINT_ROWS(root):
+            labels = [text_of(label, " ") for label in FAST_PRICE_POINT_LABELS(row)]
+            value_texts = [text_of(val) for val in FAST_PRICE_POINT_VALUES(row)]
+            if not labels or not value_texts:
+                continue
+            row_text = " ".join(labels).lower()
+            for needle, parse_value, field, value_index in PRICE_POINT_ROW_FIELDS:
+                if needle in row_text:
+                    parsed = parse_value(value_texts[value_index])
+                    if parsed is not None:
+                        row_fields[field] = parsed
+        found = FAST_SHIPPING(root)
+        if found:
+            dom_shipping = parse_money(text_of(found[0], " "))
+    except Exception:
+        pass
+
+    listing_count, lowest_price, lowest_shipping = parse_jsonld_scripts(
+        m.group(1) for m in JSONLD_SCRIPT_RE.finditer(HTML_COMMENT_RE.sub("", html))
+    )
+    if lowest_shipping is None:
+        lowest_shipping = dom_shipping
+    result = {
+        "listing_count": listing_count,
+        "lowest_price": lowest_price,
+        "lowest_shipping": lowest_shipping,
+        "lowest_total_price": (
+            round(lowest_price + (lowest_shipping or 0.0), 2) if lowest_price is not None else None
+        ),
+        "market_price": market_price,
+        "listed_median": row_fields.get("listed_median"),
+        "current_quantity": row_fields.get("current_quantity"),
+        "current_sellers": row_fields.get("current_sellers"),
+        "set_name": set_name,
+    }
+    if not has_minimum_parse_data(result):
+        return None
+    return result
+
+
+def parse_tcgplayer(html):
+    """Return dict with extracted fields: listing_count, lowest_price, lowest_shipping, lowest_total_price, market_price, listed_median, current_quantity, current_sellers, set_name.
+    This uses simple heuristics and may need tweaks for page changes.
+    """
+    fast = parse_tcgplayer_jsonld_only(html)
+    if fast is None and FAST_PARSE_ENABLED:
+        fast = parse_tcgplayer_fast(html)
+    if fast is not None:
+        return fast
+
+    soup = BeautifulSoup(html, HTML_PARSER)
+    listing_count = None
+    lowest_price = None
+    lowest_shipping = None
+    lowest_total_price = None
+    market_price = None
+    listed_median = None
+    current_quantity = None
+    current_sellers = None
+    set_name = None
+
+    # One walk over the DOM collects every element the passes below read, in
+    # document order; each pass then picks its elements from this list.
+    set_span = None
+    market_header_el = None
+    upper_prices = []
+    upper_prices_after_header = 0
+    price_rows = []
+    price_candidates = []
+    shipping_el = None
+    try:
+        for el in soup.select(PARSE_WALK_SELECTOR):
+            classes = el.get("class") or ()
+            if el.name == "tr" and el.find_parent(class_="price-points__lower"):
+                price_rows.append(el)
+            if set_span is None and el.name == "span" and el.get("data-testid") == "lblProductDetailsSetName":
+                set_span = el
+            is_upper_price = "price-points__upper__price" in classes
+            if is_upper_price:
+                upper_prices.append(el)
+            if market_header_el is None and (is_upper_price or "price-points__upper__header__title" in classes):
+                market_header_el = el
+                upper_prices_after_header = len(upper_prices)
+            if shipping_el is None and "spotlight__shipping" in classes:
+                shipping_el = el
+            if (el.name == "span" and ("price-point__data" in classes or "price" in classes or el.get("itemprop") == "price")) or (
+                el.name == "div" and "price" in classes
+            ):
+                price_candidates.append(el)
+    except Exception:
+        pass
+
+    # Extract set name from span[data-testid="lblProductDetailsSetName"]
+    try:
+        if set_span:
+            set_name = set_span.get_text(strip=True)
+    except Exception:
+        pass
+
+    # 1) Try JSON-LD <script type="application/ld+json"> — often contains offers.price
+    listing_count, lowest_price, lowest_shipping = parse_jsonld_scripts(
+        s.string for s in soup.find_all("script", type="application/ld+json")
+    )
 
     # 2) Try og:description meta tag for listing count fallback
     if listing_count is None:
         try:
             og = soup.find("meta", property="og:description")
             if og and og.get("content"):
-                m = re.search(r"(\d{1,6})\s+listings", og.get("content"), re.I)
+                m = LISTINGS_RE.search(og.get("content"))
                 if m:
                     listing_count = int(m.group(1))
         except Exception:
@@ -715,51 +1117,42 @@ def parse_tcgplayer(html):
     # 3) Price guide section for market price, listed median, quantity, sellers
     try:
         # Market Price (span.price-points__upper__price under Market Price header)
-        market_price_el = soup.select_one(".price-points__upper__header__title, .price-points__upper__price")
-        if market_price_el and "Market Price" in market_price_el.get_text():
-            price_el = market_price_el.find_next(class_="price-points__upper__price")
-            if price_el:
-                txt = price_el.get_text(strip=True).replace("$", "").replace(",", "")
+        if market_header_el and "Market Price" in market_header_el.get_text():
+            following = upper_prices[upper_prices_after_header:]
+            if following:
+                txt = following[0].get_text(strip=True).replace("$", "").replace(",", "")
                 try:
                     market_price = float(txt)
                 except Exception:
                     pass
-        # Fallback: direct select
-        if market_price is None:
-            mp = soup.select_one(".price-points__upper__price")
-            if mp:
-                market_price = parse_money(mp.get_text(strip=True))
-
-        # Listed Median (span.text: 'Listed Median:', then .price-points__lower__price)
-        for row in soup.select(".price-points__lower tr"):
-            labels = [label.get_text(" ", strip=True) for label in row.select("span.text")]
+        # Fallback: first upper price on the page
+        if market_price is None and upper_prices:
+            market_price = parse_money(upper_prices[0].get_text(strip=True))
+
+        # Lower price-point rows (span.text label, .price-points__lower__price values)
+        row_fields = {}
+        for row in price_rows:
+            labels = [label.get_text(" ", strip=True) for label in row.select(PRICE_POINT_LABEL_SELECTOR)]
             if not labels:
                 continue
+            value_texts = [val.get_text(strip=True) for val in row.select(PRICE_POINT_VALUE_SELECTOR)]
+            if not value_texts:
+                continue
             row_text = " ".join(labels).lower()
-            value_spans = row.select("span.price-points__lower__price")
-            value_texts = [val.get_text(strip=True) for val in value_spans]
-
-            if "listed median" in row_text and value_texts:
-                parsed = parse_money(value_texts[0])
-                if parsed is not None:
-                    listed_median = parsed
-
-            if "current quantity" in row_text and value_texts:
-                parsed = parse_integer(value_texts[0])
-                if parsed is not None:
-                    current_quantity = parsed
-
-            if "current sellers" in row_text and value_texts:
-                parsed = parse_integer(value_texts[-1])
-                if parsed is not None:
-                    current_sellers = parsed
+            for needle, parse_value, field, value_index in PRICE_POINT_ROW_FIELDS:
+                if needle in row_text:
+                    parsed = parse_value(value_texts[value_index])
+                    if parsed is not None:
+                        row_fields[field] = parsed
+        listed_median = row_fields.get("listed_median")
+        current_quantity = row_fields.get("current_quantity")
+        current_sellers = row_fields.get("current_sellers")
     except Exception:
         pass
 
     # 4) Price fallbacks — look for visible price elements (lowest price)
     if lowest_price is None:
         try:
-            price_candidates = soup.select("span.price-point__data, span.price, div.price, span[itemprop=price]")
             prices = []
             for p in price_candidates:
                 txt = p.get_text(strip=True).replace("$", "").replace(",", "")
@@ -773,7 +1166,6 @@ def parse_tcgplayer(html):
 
     if lowest_shipping is None:
         try:
-            shipping_el = soup.select_one(".spotlight__shipping")
             if shipping_el:
                 lowest_shipping = parse_money(shipping_el.get_text(" ", strip=True))
         except Exception:
@@ -783,19 +1175,24 @@ def parse_tcgplayer(html):
         shipping_value = lowest_shipping or 0.0
         lowest_total_price = round(lowest_price + shipping_value, 2)
 
-    # 5) Final fallback: try to parse any visible text for counts and listings.
+    # 5) Final fallback: scan the page's visible text for counts and listings.
+    # One regex pass drops comments, script/style blocks and tags, so this
+    # sees what soup.get_text() would without walking the tree. The whole
+    # string is scanned: the price guide sits mid-page, not in a fixed-size
+    # tail.
     try:
-        body_text = soup.get_text(separator=" ", strip=True)
+        if listing_count is None or current_quantity is None or current_sellers is None:
+            text = NON_TEXT_HTML_RE.sub(" ", html)
         if listing_count is None:
-            m = re.search(r"(\d{1,6})\s+listings", body_text, re.I)
+            m = LISTINGS_HTML_RE.search(text)
             if m:
                 listing_count = int(m.group(1))
         if current_quantity is None:
-            m = re.search(r"Current Quantity\s*:?\s*(\d{1,6})", body_text, re.I)
+            m = CURRENT_QUANTITY_RE.search(text)
             if m:
                 current_quantity = int(m.group(1))
         if current_sellers is None:
-            m = re.search(r"Current Sellers\s*:?\s*(\d{1,6})", body_text, re.I)
+            m = CURRENT_SELLERS_RE.search(text)
             if m:
                 current_sellers = int(m.group(1))
     except Exception:
@@ -854,7 +1251,15 @@ def ensure_product(conn, cache, name, url):
     if name and name in cache["by_name"]:
         return cache["by_name"][name]
 
-    product_id = insert_row_returning_id(conn, "products", ["name", "url"], (name, url))
+    if get_dialect(conn) == "postgres" or SQLITE_HAS_RETURNING:
+        # One statement either inserts the product or returns the id another
+        # shard inserted after our cache was loaded; the no-op update makes
+        # RETURNING yield the existing row.
+        c = conn.cursor()
+        c.execute(dialect_sql(conn, UPSERT_PRODUCT_SQL), (name, url))
+        product_id = c.fetchone()[0]
+    else:  # pragma: no cover - SQLite < 3.35
+        product_id = insert_row_returning_id(conn, "products", ["name", "url"], (name, url))
     if url:
         cache["by_url"][url] = product_id
     if name:
@@ -863,85 +1268,200 @@ def ensure_product(conn, cache, name, url):
 
 
 def insert_snapshot(conn, product_id, listing_count, lowest_price, lowest_shipping=None, lowest_total_price=None, market_price=None, listed_median=None, current_quantity=None, current_sellers=None, set_name=None, source="TCGplayer", run_id=None, snapshot_timestamp=None, snapshot_date=None):
-    c = conn.cursor()
-    effective_timestamp = snapshot_timestamp or datetime.utcnow().isoformat()
-    effective_snapshot_date = snapshot_date or resolve_snapshot_date()
-    ph = "%s" if get_dialect(conn) == "postgres" else "?"
+    parsed = {
+        "listing_count": listing_count,
+        "lowest_price": lowest_price,
+        "lowest_shipping": lowest_shipping,
+        "lowest_total_price": lowest_total_price,
+        "listed_median": listed_median,
+        "market_price": market_price,
+        "current_quantity": current_quantity,
+        "current_sellers": current_sellers,
+        "set_name": set_name,
+    }
+    row = snapshot_row(
+        product_id,
+        parsed,
+        source,
+        run_id,
+        snapshot_timestamp or datetime.utcnow().isoformat(),
+        snapshot_date or resolve_snapshot_date(),
+    )
     try:
-        c.execute(
-            """
-            SELECT id
-            FROM listings
-            WHERE product_id = {ph} AND source = {ph} AND snapshot_date = {ph}
-            ORDER BY timestamp DESC, id DESC
-            LIMIT 1
-            """.format(ph=ph),
-            (product_id, source, effective_snapshot_date),
-        )
-        existing = c.fetchone()
-        if existing:
-            c.execute(
-                """
-                UPDATE listings
-                SET timestamp = {ph},
-                    listing_count = {ph},
-                    lowest_price = {ph},
-                    lowest_shipping = {ph},
-                    lowest_total_price = {ph},
-                    median_price = {ph},
-                    market_price = {ph},
-                    current_quantity = {ph},
-                    current_sellers = {ph},
-                    set_name = {ph},
-                    run_id = {ph}
-                WHERE id = {ph}
-                """.format(ph=ph),
-                (
-                    effective_timestamp,
-                    listing_count,
-                    lowest_price,
-                    lowest_shipping,
-                    lowest_total_price,
-                    listed_median,
-                    market_price,
-                    current_quantity,
-                    current_sellers,
-                    set_name,
-                    run_id,
-                    existing[0],
-                ),
-            )
-            return True
-
-        c.execute(
-            """
-            INSERT INTO listings (
-                product_id, timestamp, snapshot_date, listing_count, lowest_price, lowest_shipping, lowest_total_price, median_price, market_price, current_quantity, current_sellers, set_name, source, run_id
-            ) VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})
-            """.format(ph=ph),
-            (
-                product_id,
-                effective_timestamp,
-                effective_snapshot_date,
-                listing_count,
-                lowest_price,
-                lowest_shipping,
-                lowest_total_price,
-                listed_median,
-                market_price,
-                current_quantity,
-                current_sellers,
-                set_name,
-                source,
-                run_id,
-            ),
-        )
+        insert_snapshots(conn, [row])
     except Exception as e:
         debug_log(f"[DEBUG] DB insertion error: {e}")
         raise
     return True
 
 
+SNAPSHOT_COLUMNS = (
+    "product_id",
+    "timestamp",
+    "snapshot_date",
+    "listing_count",
+    "lowest_price",
+    "lowest_shipping",
+    "lowest_total_price",
+    "median_price",
+    "market_price",
+    "current_quantity",
+    "current_sellers",
+    "set_name",
+    "source",
+    "run_id",
+)
+# Flush buffered snapshots at least this often, even when --commit-every is 0.
+SNAPSHOT_FLUSH_SIZE = 500
+
+# Hot-path statements as module constants; dialect_sql() fills in the
+# placeholder style once per dialect so every call reuses the same text
+# (and so the driver's prepared-statement cache).
+UPSERT_LISTING_SQL = """
+INSERT INTO listings ({columns})
+VALUES ({placeholders})
+ON CONFLICT (product_id, source, snapshot_date) WHERE snapshot_date IS NOT NULL
+DO UPDATE SET {updates}
+""".format(
+    columns=", ".join(SNAPSHOT_COLUMNS),
+    placeholders=", ".join(["{ph}"] * len(SNAPSHOT_COLUMNS)),
+    updates=", ".join(
+        f"{column} = excluded.{column}" for column in SNAPSHOT_COLUMNS if column not in {"product_id", "snapshot_date", "source"}
+    ),
+)
+UPSERT_PRODUCT_SQL = """
+INSERT INTO products (name, url) VALUES ({ph}, {ph})
+ON CONFLICT (url) WHERE url IS NOT NULL AND url != ''
+DO UPDATE SET name = products.name
+RETURNING id
+"""
+# UPSERT ... RETURNING needs SQLite 3.35+.
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+UPSERT_HTTP_VALIDATORS_SQL = """
+INSERT INTO http_validators (url, etag, last_modified, updated_at)
+VALUES ({ph}, {ph}, {ph}, {ph})
+ON CONFLICT (url) DO UPDATE SET
+    etag = excluded.etag, last_modified = excluded.last_modified, updated_at = excluded.updated_at
+"""
+LATEST_SNAPSHOT_SQL = """
+SELECT listing_count, lowest_price, lowest_shipping, lowest_total_price, median_price,
+       market_price, current_quantity, current_sellers, set_name
+FROM listings
+WHERE product_id = {ph} AND source = {ph}
+ORDER BY timestamp DESC, id DESC
+LIMIT 1
+"""
+INSERT_FAILURE_SQL = """
+INSERT INTO scrape_failures (run_id, product_name, url, stage, reason, http_status, attempts, created_at)
+VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})
+"""
+_DIALECT_SQL_CACHE = {}
+
+
+def dialect_sql(conn, template):
+    dialect = get_dialect(conn)
+    key = (dialect, template)
+    sql = _DIALECT_SQL_CACHE.get(key)
+    if sql is None:
+        sql = _DIALECT_SQL_CACHE[key] = template.format(ph="%s" if dialect == "postgres" else "?")
+    return sql
+
+
+def snapshot_row(product_id, parsed, source, run_id, snapshot_timestamp, snapshot_date):
+    """Return one listings row, in SNAPSHOT_COLUMNS order, for a parsed page."""
+    return (
+        product_id,
+        snapshot_timestamp,
+        snapshot_date,
+        parsed.get("listing_count"),
+        parsed.get("lowest_price"),
+        parsed.get("lowest_shipping"),
+        parsed.get("lowest_total_price"),
+        parsed.get("listed_median"),
+        parsed.get("market_price"),
+        parsed.get("current_quantity"),
+        parsed.get("current_sellers"),
+        parsed.get("set_name"),
+        source,
+        run_id,
+    )
+
+
+def insert_snapshots(conn, rows):
+    """Upsert snapshot rows with one executemany.
+
+    A second run on the same snapshot_date replaces that day's row via the
+    unique (product_id, source, snapshot_date) index.
+    """
+    if not rows:
+        return 0
+    conn.cursor().executemany(dialect_sql(conn, UPSERT_LISTING_SQL), rows)
+    return len(rows)
+
+
+def flush_snapshots(conn, pending):
+    """Write buffered (row, meta) entries; return [(entry, exc)] for rows that failed.
+
+    The batch goes out as one executemany. If that raises, rows are retried
+    one by one so a single bad row does not take the rest of the batch with it.
+    """
+    if not pending:
+        return []
+    try:
+        insert_snapshots(conn, [row for row, _ in pending])
+        return []
+    except Exception as e:
+        debug_log(f"[DEBUG] Batched snapshot insert failed, retrying per row: {e}")
+
+    failed = []
+    for entry in pending:
+        try:
+            insert_snapshots(conn, [entry[0]])
+        except Exception as e:
+            failed.append((entry, e))
+    return failed
+
+
+def load_http_validators(conn):
+    """Return {url: {"etag": ..., "last_modified": ...}} saved by earlier runs."""
+    c = conn.cursor()
+    c.execute("SELECT url, etag, last_modified FROM http_validators")
+    return {url: {"etag": etag, "last_modified": last_modified} for url, etag, last_modified in c.fetchall()}
+
+
+def save_http_validators(conn, rows):
+    """Upsert (url, etag, last_modified, updated_at) rows with one executemany."""
+    if not rows:
+        return 0
+    conn.cursor().executemany(dialect_sql(conn, UPSERT_HTTP_VALIDATORS_SQL), rows)
+    return len(rows)
+
+
+def latest_snapshot_values(conn, product_id, source):
+    """Return the product's most recent snapshot as a parse_tcgplayer-style dict, or None."""
+    c = conn.cursor()
+    c.execute(dialect_sql(conn, LATEST_SNAPSHOT_SQL), (product_id, source))
+    row = c.fetchone()
+    if row is None:
+        return None
+    return dict(
+        zip(
+            (
+                "listing_count",
+                "lowest_price",
+                "lowest_shipping",
+                "lowest_total_price",
+                "listed_median",
+                "market_price",
+                "current_quantity",
+                "current_sellers",
+                "set_name",
+            ),
+            row,
+        )
+    )
+
+
 def mark_stale_runs(conn, source):
     c = conn.cursor()
     ph = "%s" if get_dialect(conn) == "postgres" else "?"
@@ -969,6 +1489,17 @@ def save_diagnostic(html, out_dir, prefix):
         return None
 
 
+def open_failure_log(out_dir):
+    """Open the run's append-only JSONL log of fetch failures."""
+    os.makedirs(out_dir, exist_ok=True)
+    return open(os.path.join(out_dir, "failures.jsonl"), "a", encoding="utf-8")
+
+
+def append_failure_log(fh, **record):
+    record.setdefault("ts", datetime.utcnow().isoformat())
+    fh.write(json.dumps(record, sort_keys=True) + "\n")
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--csv", default=DEFAULT_CSV, help="CSV file with name,url columns")
@@ -980,6 +1511,7 @@ def main():
     parser.add_argument("--selenium", action="store_true", help="Compatibility flag; Selenium is enabled by default when available")
     parser.add_argument("--no-selenium", action="store_true", help="Disable Selenium fallback and use requests only")
     parser.add_argument("--headless", action="store_true", help="When using --selenium, run Chrome headless")
+    parser.add_argument("--chrome-cache-dir", default="", help="Persist Chrome's disk cache here across product pages (disabled when empty)")
     parser.add_argument("--source", default="TCGplayer", help="Snapshot source label (e.g., TCGplayer, eBay)")
     parser.add_argument("--request-timeout", type=float, default=12.0, help="HTTP timeout per request in seconds")
     parser.add_argument("--max-retries", type=int, default=3, help="Max HTTP retry attempts per URL")
@@ -987,6 +1519,9 @@ def main():
     parser.add_argument("--max-selenium-restarts", type=int, default=2, help="How many times to restart Selenium when session dies")
     parser.add_argument("--commit-every", type=int, default=DEFAULT_COMMIT_EVERY, help="Commit SQLite writes every N attempts")
     parser.add_argument("--snapshot-date", default="", help="Store this run under a specific YYYY-MM-DD snapshot date")
+    parser.add_argument("--fetch-workers", type=int, default=1, help="Background threads fetching product pages ahead of the parser (1 = one request at a time)")
+    parser.add_argument("--conditional-get", action="store_true", help="Revalidate pages with the ETag/Last-Modified seen on earlier runs; unchanged pages reuse their last snapshot")
+    parser.add_argument("--parse-workers", type=int, default=0, help="Parse fetched pages in this many processes (0 = parse inline)")
     parser.add_argument("--debug", action="store_true", help="Show detailed fetch and Selenium debug logs")
     parser.add_argument("--shard-index", type=int, default=0, help="Zero-based shard index for parallel batch workers")
     parser.add_argument("--shard-count", type=int, default=1, help="Total shard count for parallel batch workers")
@@ -995,11 +1530,6 @@ def main():
     global DEBUG
     DEBUG = args.debug
 
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36",
-        "Accept-Language": "en-US,en;q=0.9",
-    }
-
     # Open DB
     conn = connect_database(resolve_database_target(args.db))
     configure_connection(conn)
@@ -1014,8 +1544,8 @@ def main():
         args_dict=vars(args),
     )
     product_cache = load_product_cache(conn)
-    session = requests.Session()
-    session.headers.update(headers)
+    http_validators = load_http_validators(conn) if args.conditional_get else None
+    session = build_http_session(pool_size=max(HTTP_POOL_SIZE, args.fetch_workers))
     snapshot_date = resolve_snapshot_date(args.snapshot_date)
 
     driver = None
@@ -1027,13 +1557,56 @@ def main():
     count_attempted = 0
     count_parse_failed = 0
     count_written = 0
+    pending_snapshots = []
+    parse_pool = None
+    failure_log = None
+
+    def commit_progress():
+        """Flush buffered snapshots, record any rows that failed, then commit."""
+        nonlocal count_processed, count_failed, count_written
+        # Every snapshot in a flush shares one collection timestamp.
+        snapshot_timestamp = datetime.utcnow().isoformat()
+        batch = [
+            (snapshot_row(product_id, parsed, args.source, run_id, snapshot_timestamp, snapshot_date), meta)
+            for product_id, parsed, meta in pending_snapshots
+        ]
+        failed_entries = set()
+        for (_, meta), exc in flush_snapshots(conn, batch):
+            failed_entries.add(id(meta))
+            count_processed -= 1
+            count_written -= 1
+            count_failed += 1
+            record_failure(
+                conn,
+                run_id,
+                meta["name"],
+                meta["url"],
+                "db",
+                f"insert_error_{type(exc).__name__}",
+                http_status=meta["http_status"],
+                attempts=meta["attempts"],
+            )
+            print(f"[{meta['index']}/{total_rows}] failed to save {meta['name']}", flush=True)
+        # Validators are kept only once the snapshot they vouch for is saved.
+        validator_rows = []
+        for _, meta in batch:
+            page_validators = meta.get("validators")
+            if id(meta) in failed_entries or not page_validators:
+                continue
+            if page_validators.get("etag") or page_validators.get("last_modified"):
+                validator_rows.append(
+                    (meta["url"], page_validators.get("etag"), page_validators.get("last_modified"), snapshot_timestamp)
+                )
+        save_http_validators(conn, validator_rows)
+        pending_snapshots.clear()
+        conn.commit()
 
     run_status = "completed"
     try:
         if selenium_enabled:
             try:
                 print("Starting Selenium Chrome (headless=%s) ..." % args.headless, flush=True)
-                driver = make_driver(headless=args.headless)
+                driver = make_driver(headless=args.headless, disk_cache_dir=args.chrome_cache_dir or None)
             except Exception as e:
                 print(f"Failed to start Selenium driver: {e}", flush=True)
                 selenium_enabled = False
@@ -1041,18 +1614,38 @@ def main():
         with open(args.csv, newline="", encoding="utf-8") as fh:
             rows = list(csv.DictReader(fh))
         rows = filter_rows_for_shard(rows, shard_index=args.shard_index, shard_count=args.shard_count)
+        if args.limit:
+            rows = rows[: args.limit]
         total_rows = len(rows)
         
         print(f"\n🚀 Starting scrape: {total_rows} products, Selenium={'ON' if selenium_enabled else 'OFF'}", flush=True)
         print(f"Snapshot date: {snapshot_date}", flush=True)
         print(f"Limit: {args.limit if args.limit else 'None (all)'}\n", flush=True)
 
-        for i, row in enumerate(rows, start=1):
-            if args.limit and count_attempted >= args.limit:
-                break
+        fetch_kwargs = {
+            "timeout": args.request_timeout,
+            "max_retries": args.max_retries,
+            "base_backoff": args.retry_backoff,
+        }
+        # Fetches run ahead in background threads that also own the
+        # politeness delay, so the next page downloads (and waits out its
+        # delay) while this thread parses and writes the current one. One
+        # worker keeps the old one-request-at-a-time pacing.
+        if args.parse_workers > 0:
+            parse_pool = ProcessPoolExecutor(max_workers=args.parse_workers)
+        fetched = prefetch_pages(
+            session,
+            rows,
+            max(1, args.fetch_workers),
+            args.delay_min,
+            args.delay_max,
+            parse_pool=parse_pool,
+            validators=http_validators,
+            **fetch_kwargs,
+        )
 
-            name = (row.get("name") or row.get("title") or "").strip()
-            url = (row.get("url") or row.get("link") or "").strip()
+        for i, (row, prefetched, preparsed) in enumerate(fetched, start=1):
+            name, url = row_name_url(row)
             
             print_progress(i, total_rows, count_processed, count_failed, f"Processing: {name[:40]}")
             if not DEBUG:
@@ -1062,24 +1655,31 @@ def main():
                 count_failed += 1
                 record_failure(conn, run_id, name, url, "input", "missing_url", attempts=0)
                 if args.commit_every > 0 and count_attempted % args.commit_every == 0:
-                    conn.commit()
+                    commit_progress()
                 continue
 
-            # Fetch HTML
-            html, status_code, attempts_used, fetch_reason = fetch_page_with_retries(
-                session,
-                url,
-                headers,
-                timeout=args.request_timeout,
-                max_retries=args.max_retries,
-                base_backoff=args.retry_backoff,
-            )
+            # HTML was fetched ahead by prefetch_pages
+            validators = http_validators.setdefault(url, {}) if http_validators is not None else None
+            html, status_code, attempts_used, fetch_reason = prefetched
+            # A 304 means the page is unchanged since its last snapshot; carry
+            # that snapshot forward. Without one to reuse, fetch the page in full.
+            reused = None
+            if fetch_reason == "not_modified":
+                try:
+                    reused = latest_snapshot_values(conn, ensure_product(conn, product_cache, name, url), args.source)
+                except Exception as e:
+                    debug_log(f"[DEBUG] Could not load last snapshot for {url}: {summarize_exception(e)}")
+                if reused is None:
+                    validators.clear()
+                    html, status_code, attempts_used, fetch_reason = fetch_page_with_retries(
+                        session, url, validators=validators, **fetch_kwargs
+                    )
             # If requests failed, try Selenium if enabled
-            if not html and selenium_enabled:
+            if not html and reused is None and selenium_enabled:
                 try:
                     if not is_driver_alive(driver):
                         raise RuntimeError("selenium_session_dead")
-                    html = selenium_fetch_page(url, driver, wait_selector="li.listing-item, span.price-point__data", timeout=8)
+                    html = selenium_fetch_page(url, driver, wait_selector=PRODUCT_WAIT_SELECTOR, timeout=10)
                     if html:
                         fetch_reason = "selenium_fallback_ok"
                 except RuntimeError:
@@ -1092,8 +1692,8 @@ def main():
                         except Exception:
                             pass
                         try:
-                            driver = make_driver(headless=args.headless)
-                            html = selenium_fetch_page(url, driver, wait_selector="li.listing-item, span.price-point__data", timeout=8)
+                            driver = make_driver(headless=args.headless, disk_cache_dir=args.chrome_cache_dir or None)
+                            html = selenium_fetch_page(url, driver, wait_selector=PRODUCT_WAIT_SELECTOR, timeout=10)
                             if html:
                                 fetch_reason = "selenium_fallback_ok_after_restart"
                         except Exception as restart_exc:
@@ -1104,10 +1704,21 @@ def main():
                 except Exception as selenium_exc:
                     debug_log(f"[DEBUG] Selenium fallback error: {summarize_exception(selenium_exc)}")
             
-            if not html:
+            if not html and reused is None:
                 count_attempted += 1
                 count_failed += 1
-                save_diagnostic("", args.diagnostics_dir, f"fetchfail_{i}")
+                # No HTML to keep; one JSONL line instead of an empty file per failure.
+                if failure_log is None:
+                    failure_log = open_failure_log(args.diagnostics_dir)
+                append_failure_log(
+                    failure_log,
+                    i=i,
+                    run_id=run_id,
+                    url=url,
+                    reason=fetch_reason,
+                    http_status=status_code,
+                    attempts=attempts_used,
+                )
                 record_failure(
                     conn,
                     run_id,
@@ -1119,24 +1730,36 @@ def main():
                     attempts=attempts_used,
                 )
                 if args.commit_every > 0 and count_attempted % args.commit_every == 0:
-                    conn.commit()
-                time.sleep(random.uniform(args.delay_min, args.delay_max))
+                    commit_progress()
                 continue
 
-            # Parse
-            parsed = parse_tcgplayer(html)
+            # Parse, unless the parse pool already handled this HTML
+            rerendered = False
+            if reused is not None:
+                parsed = reused
+            elif preparsed is not None and not fetch_reason.startswith("selenium_fallback"):
+                parsed = preparsed
+            else:
+                parsed = parse_tcgplayer(html)
             
-            # If parser got no data and Selenium is available, retry with Selenium (page was likely JS-rendered)
+            # If parser got no data and Selenium is available, retry with Selenium when the
+            # HTML is the unhydrated JS shell. A fully rendered page with no data (e.g. out
+            # of stock) won't change in a browser, and a page that already came from
+            # Selenium was rendered with the same wait; don't render either again.
             if (parsed.get('listing_count') is None and 
                 parsed.get('market_price') is None and 
                 parsed.get('listed_median') is None and 
-                selenium_enabled):
+                selenium_enabled and
+                reused is None and
+                not fetch_reason.startswith("selenium_fallback") and
+                html_looks_like_tcgplayer_shell(html)):
                 try:
                     if not is_driver_alive(driver):
                         raise RuntimeError("selenium_session_dead")
-                    html_selenium = selenium_fetch_page(url, driver, wait_selector=".price-points__upper__price, .price-points__lower", timeout=10)
+                    html_selenium = selenium_fetch_page(url, driver, wait_selector=PRODUCT_WAIT_SELECTOR, timeout=10)
                     if html_selenium:
                         parsed = parse_tcgplayer(html_selenium)
+                        rerendered = True
                 except RuntimeError:
                     if selenium_restart_count < args.max_selenium_restarts:
                         selenium_restart_count += 1
@@ -1147,10 +1770,11 @@ def main():
                         except Exception:
                             pass
                         try:
-                            driver = make_driver(headless=args.headless)
-                            html_selenium = selenium_fetch_page(url, driver, wait_selector=".price-points__upper__price, .price-points__lower", timeout=10)
+                            driver = make_driver(headless=args.headless, disk_cache_dir=args.chrome_cache_dir or None)
+                            html_selenium = selenium_fetch_page(url, driver, wait_selector=PRODUCT_WAIT_SELECTOR, timeout=10)
                             if html_selenium:
                                 parsed = parse_tcgplayer(html_selenium)
+                                rerendered = True
                         except Exception as restart_exc:
                             debug_log(f"[DEBUG] Selenium restart failed: {summarize_exception(restart_exc)}")
                     else:
@@ -1175,35 +1799,31 @@ def main():
                     attempts=attempts_used,
                 )
                 if args.commit_every > 0 and count_attempted % args.commit_every == 0:
-                    conn.commit()
-                time.sleep(random.uniform(args.delay_min, args.delay_max))
+                    commit_progress()
                 continue
             
-            # Insert into DB
+            # Insert into DB: snapshots are buffered and written in batches by
+            # commit_progress(); failures there are re-counted as db failures.
             try:
-                snapshot_timestamp = datetime.utcnow().isoformat()
                 product_id = ensure_product(conn, product_cache, name, url)
-                wrote_snapshot = insert_snapshot(
-                    conn,
-                    product_id,
-                    parsed.get('listing_count'),
-                    parsed.get('lowest_price'),
-                    lowest_shipping=parsed.get('lowest_shipping'),
-                    lowest_total_price=parsed.get('lowest_total_price'),
-                    market_price=parsed.get('market_price'),
-                    listed_median=parsed.get('listed_median'),
-                    current_quantity=parsed.get('current_quantity'),
-                    current_sellers=parsed.get('current_sellers'),
-                    set_name=parsed.get('set_name'),
-                    source=args.source,
-                    run_id=run_id,
-                    snapshot_timestamp=snapshot_timestamp,
-                    snapshot_date=snapshot_date,
+                pending_snapshots.append(
+                    (
+                        product_id,
+                        parsed,
+                        {
+                            "index": i,
+                            "name": name,
+                            "url": url,
+                            "http_status": status_code,
+                            "attempts": attempts_used,
+                            # Only a page the HTTP parse itself read vouches for its validators.
+                            "validators": dict(validators) if validators and fetch_reason == "ok" and not rerendered else None,
+                        },
+                    )
                 )
                 count_attempted += 1
                 count_processed += 1
-                if wrote_snapshot:
-                    count_written += 1
+                count_written += 1
                 if not DEBUG:
                     print(
                         f"[{i}/{total_rows}] saved listing_count={parsed.get('listing_count')} lowest={parsed.get('lowest_price')} market={parsed.get('market_price')}",
@@ -1211,7 +1831,8 @@ def main():
                     )
             except Exception as e:
                 count_attempted += 1
-                save_diagnostic(html, args.diagnostics_dir, f"dberror_{i}")
+                if html:
+                    save_diagnostic(html, args.diagnostics_dir, f"dberror_{i}")
                 count_failed += 1
                 record_failure(
                     conn,
@@ -1226,21 +1847,22 @@ def main():
                 if not DEBUG:
                     print(f"[{i}/{total_rows}] failed to save {name}", flush=True)
 
-            if args.commit_every > 0 and count_attempted % args.commit_every == 0:
-                conn.commit()
-
-            # politeness delay
-            time.sleep(random.uniform(args.delay_min, args.delay_max))
-        conn.commit()
+            if (args.commit_every > 0 and count_attempted % args.commit_every == 0) or len(pending_snapshots) >= SNAPSHOT_FLUSH_SIZE:
+                commit_progress()
+        commit_progress()
     except KeyboardInterrupt:
         run_status = "interrupted"
-        conn.commit()
+        commit_progress()
         raise
     except Exception:
         run_status = "failed"
-        conn.commit()
+        commit_progress()
         raise
     finally:
+        if failure_log is not None:
+            failure_log.close()
+        if parse_pool is not None:
+            parse_pool.shutdown(cancel_futures=True)
         if driver:
             try:
                 driver.quit()
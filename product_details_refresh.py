@@ -11,7 +11,6 @@ import time
 from datetime import datetime
 from urllib.parse import urlparse
 
-import requests
 from bs4 import BeautifulSoup
 
 from db import (
@@ -21,7 +20,9 @@ from db import (
     sql_placeholder_list,
 )
 from populate_db import (
+    HTML_PARSER,
     ensure_runtime_schema,
+    build_http_session,
     fetch_page_with_retries,
     is_driver_alive,
     make_driver,
@@ -119,7 +120,7 @@ def parse_release_date(text):
 
 
 def parse_product_details(html, fallback_name="", source_url=""):
-    soup = BeautifulSoup(html or "", "html.parser")
+    soup = BeautifulSoup(html or "", HTML_PARSER)
     set_name = None
     raw_title = None
     release_date = None
@@ -246,12 +247,7 @@ def main():
     configure_db_connection(conn)
     ensure_runtime_schema(conn)
 
-    session = requests.Session()
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36",
-        "Accept-Language": "en-US,en;q=0.9",
-    }
-    session.headers.update(headers)
+    session = build_http_session()
 
     driver = None
     selenium_enabled = not args.no_selenium
@@ -272,7 +268,6 @@ def main():
         html, _, _, _ = fetch_page_with_retries(
             session,
             url,
-            headers,
             timeout=args.request_timeout,
             max_retries=args.max_retries,
             base_backoff=args.retry_backoff,
@@ -298,9 +293,11 @@ def main():
             f"[{processed}/{len(rows)}] {name} -> type={details.get('product_type')} set={details.get('set_name') or '-'} release={details.get('release_date') or '-'}",
             flush=True,
         )
-        conn.commit()
+        if processed % 25 == 0:
+            conn.commit()
         time.sleep(max(0.0, args.delay_min))
 
+    conn.commit()
     conn.close()
     if driver:
         try:
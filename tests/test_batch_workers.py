@@ -102,11 +102,13 @@ class TestBatchWorkers(unittest.TestCase):
             product_line_name="pokemon",
             product_type_name="Cards",
             headless=True,
+            http_workers=10,
         )
         command = build_catalog_worker_command(args, shard_index=0, shard_count=4, output_path="out.csv")
         self.assertIn("link_scraper.py", command)
         self.assertIn("--category-slug", command)
         self.assertIn("Cards", command)
+        self.assertEqual(command[command.index("--http-workers") + 1], "2")
 
     def test_plan_worker_commands(self):
         args = Namespace(
@@ -1,7 +1,7 @@
 import sqlite3
 import unittest
 
-from populate_db import ensure_runtime_schema, insert_snapshot
+from populate_db import ensure_product, ensure_runtime_schema, insert_snapshot, insert_snapshots, snapshot_row
 
 
 class TestDailySnapshots(unittest.TestCase):
@@ -85,6 +85,57 @@ class TestDailySnapshots(unittest.TestCase):
         self.assertEqual(len(rows), 1)
         self.assertEqual(rows[0], ("2026-03-24", "2026-03-24T05:00:00", 8, 98.0, 3.0, 101.0, 101.0, 2))
 
+    def test_batched_snapshots_upsert_same_day_rows(self):
+        conn = self.make_conn()
+        conn.execute("INSERT INTO products (name, url) VALUES (?, ?)", ("Test Product", "https://example.com/a"))
+        product_id = conn.execute("SELECT id FROM products").fetchone()[0]
+
+        first = {"listing_count": 10, "lowest_price": 100.0, "market_price": 105.0}
+        second = {"listing_count": 8, "lowest_price": 98.0, "market_price": 101.0, "set_name": "Base"}
+        insert_snapshots(
+            conn,
+            [
+                snapshot_row(product_id, first, "TCGplayer", 1, "2026-03-23T03:00:00", "2026-03-23"),
+                snapshot_row(product_id, first, "TCGplayer", 1, "2026-03-24T03:00:00", "2026-03-24"),
+            ],
+        )
+        insert_snapshots(conn, [snapshot_row(product_id, second, "TCGplayer", 2, "2026-03-24T05:00:00", "2026-03-24")])
+        conn.commit()
+
+        rows = conn.execute(
+            """
+            SELECT snapshot_date, timestamp, listing_count, lowest_price, market_price, set_name, run_id
+            FROM listings
+            WHERE product_id = ?
+            ORDER BY snapshot_date
+            """,
+            (product_id,),
+        ).fetchall()
+
+        self.assertEqual(
+            rows,
+            [
+                ("2026-03-23", "2026-03-23T03:00:00", 10, 100.0, 105.0, None, 1),
+                ("2026-03-24", "2026-03-24T05:00:00", 8, 98.0, 101.0, "Base", 2),
+            ],
+        )
+
+    def test_ensure_product_returns_row_inserted_after_cache_load(self):
+        conn = self.make_conn()
+        cache = {"by_url": {}, "by_name": {}}
+        # Another shard inserts the product after this worker built its cache.
+        conn.execute("INSERT INTO products (name, url) VALUES (?, ?)", ("Shard Copy", "https://example.com/a"))
+        existing_id = conn.execute("SELECT id FROM products").fetchone()[0]
+
+        self.assertEqual(ensure_product(conn, cache, "Test Product", "https://example.com/a"), existing_id)
+        self.assertEqual(cache["by_url"]["https://example.com/a"], existing_id)
+        new_id = ensure_product(conn, cache, "Other", "https://example.com/b")
+        self.assertNotEqual(new_id, existing_id)
+        self.assertEqual(
+            conn.execute("SELECT name FROM products WHERE id = ?", (existing_id,)).fetchone()[0],
+            "Shard Copy",
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
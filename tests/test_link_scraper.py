@@ -1,6 +1,45 @@
+import json
+import sqlite3
+import tempfile
 import unittest
 
-from link_scraper import build_search_url, filter_pages_for_shard
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchElementException, WebDriverException
+
+from create_db import create_schema
+
+import link_scraper
+from link_scraper import (
+    RateLimitBackoff,
+    build_search_api_payload,
+    build_search_url,
+    driver_session_dead,
+    fetch_and_parse_page,
+    filter_pages_for_shard,
+    load_search_page,
+    normalize_cache_url,
+    parse_search_api_response,
+    parse_search_page,
+    save_products_to_db,
+    search_api_cache_key,
+    write_cached_page,
+)
+
+
+SEARCH_PAGE_HTML = """
+<html><body>
+  <div class="search-result">
+    <a data-testid="product-card__image--1" href="/product/1/pokemon-etb?page=1">
+      <span class="product-card__title">Elite Trainer Box</span>
+    </a>
+  </div>
+  <div class="search-result">
+    <a data-testid="product-card__image--2" href="/product/2/pokemon-booster-box?page=1">
+      <img alt="Booster Box" src="box.jpg">
+    </a>
+  </div>
+  <a href="/help">Help</a>
+</body></html>
+"""
 
 
 class TestLinkScraper(unittest.TestCase):
@@ -20,6 +59,155 @@ class TestLinkScraper(unittest.TestCase):
         self.assertEqual(filter_pages_for_shard(6, shard_index=0, shard_count=2), [1, 3, 5])
         self.assertEqual(filter_pages_for_shard(6, shard_index=1, shard_count=2), [2, 4, 6])
 
+    def test_rate_limit_backoff_grows_caps_and_resets(self):
+        backoff = RateLimitBackoff(max_delay=5)
+        self.assertEqual(backoff.throttled(), 2)
+        self.assertEqual(backoff.throttled(), 4)
+        self.assertEqual(backoff.throttled(), 5)
+        backoff.succeeded()
+        self.assertEqual(backoff.throttled(retry_after="3"), 3)
+
+    def test_normalize_cache_url_sorts_and_drops_volatile_params(self):
+        self.assertEqual(
+            normalize_cache_url("https://WWW.tcgplayer.com/search/pokemon/product?page=2&utm_source=x&view=grid"),
+            normalize_cache_url("https://www.tcgplayer.com/search/pokemon/product?view=grid&page=2"),
+        )
+        self.assertNotEqual(
+            normalize_cache_url("https://www.tcgplayer.com/search/pokemon/product?page=2"),
+            normalize_cache_url("https://www.tcgplayer.com/search/pokemon/product?page=3"),
+        )
+
+    def test_search_api_payload_pages_like_the_html_grid(self):
+        payload = build_search_api_payload(3, product_line_name="pokemon", product_type_name="Sealed Products")
+        self.assertEqual(payload["from"], 48)
+        self.assertEqual(payload["size"], 24)
+        self.assertEqual(payload["filters"]["term"]["productTypeName"], ["Sealed Products"])
+
+    def test_parse_search_api_response_builds_canonical_product_urls(self):
+        data = {
+            "results": [
+                {
+                    "results": [
+                        {
+                            "productId": 672434.0,
+                            "productName": "Ascended Heroes Booster Pack",
+                            "productLineUrlName": "Pokemon",
+                            "setUrlName": "ME Ascended Heroes",
+                            "productUrlName": "Ascended Heroes Booster Pack",
+                        },
+                        {"productName": "No id"},
+                    ]
+                }
+            ]
+        }
+        self.assertEqual(
+            parse_search_api_response(data),
+            [
+                (
+                    "Ascended Heroes Booster Pack",
+                    "https://www.tcgplayer.com/product/672434/pokemon-me-ascended-heroes-ascended-heroes-booster-pack?page=1",
+                )
+            ],
+        )
+        self.assertEqual(parse_search_api_response({"results": []}), [])
+
+    def test_cache_hits_skip_the_network(self):
+        class NoNetworkSession:
+            def request(self, *args, **kwargs):
+                raise AssertionError("network request on a cache hit")
+
+            get = post = request
+
+        api_data = {"results": [{"results": [{"productId": 7, "productName": "ETB", "productUrlName": "etb"}]}]}
+        url = build_search_url(1)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            write_cached_page(cache_dir, search_api_cache_key(1), json.dumps(api_data), suffix=".json")
+            products = fetch_and_parse_page(NoNetworkSession(), url, cache_dir=cache_dir, api_page=1)
+            self.assertEqual(products, [("ETB", "https://www.tcgplayer.com/product/7/etb?page=1")])
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            write_cached_page(cache_dir, url, SEARCH_PAGE_HTML)
+            products = fetch_and_parse_page(NoNetworkSession(), url, cache_dir=cache_dir, api_page=1)
+            self.assertEqual(len(products), 2)
+
+    def test_driver_session_dead_detects_crashed_chrome(self):
+        self.assertTrue(driver_session_dead(InvalidSessionIdException("gone")))
+        self.assertTrue(driver_session_dead(WebDriverException("unknown error: chrome not reachable")))
+        self.assertFalse(driver_session_dead(WebDriverException("unknown error: net::ERR_CONNECTION_RESET")))
+
+    def test_card_wait_timeout_retries_on_the_same_browser(self):
+        class SlowThenReadyDriver:
+            def __init__(self, ready_after=2):
+                self.ready_after = ready_after
+                self.gets = 0
+                self.scripts = []
+                self.cookies_cleared = 0
+
+            def set_page_load_timeout(self, seconds):
+                pass
+
+            def get(self, url):
+                self.gets += 1
+
+            def find_element(self, by, selector):
+                if self.gets < self.ready_after:
+                    raise NoSuchElementException("no cards yet")
+                return object()
+
+            def execute_script(self, script):
+                self.scripts.append(script)
+
+            def delete_all_cookies(self):
+                self.cookies_cleared += 1
+
+        driver = SlowThenReadyDriver()
+        result = load_search_page(driver, "https://example.com/search", 1, retries=1, wait_time=0, consecutive_failures=1)
+        self.assertEqual(result, (driver, None, 0))
+        self.assertEqual(driver.gets, 2)
+        self.assertEqual(driver.cookies_cleared, 1)
+        self.assertIn("window.stop();", driver.scripts)
+
+        # Still no cards after the last attempt: use the page as it is.
+        driver = SlowThenReadyDriver(ready_after=10)
+        self.assertEqual(load_search_page(driver, "https://example.com/search", 1, retries=1, wait_time=0), (driver, None, 0))
+        self.assertEqual(driver.gets, 2)
+
+    def test_save_products_to_db_skips_known_urls(self):
+        conn = sqlite3.connect(":memory:")
+        create_schema(conn)
+        save_products_to_db(conn, [("ETB", "https://www.tcgplayer.com/product/1/etb?page=1")])
+        save_products_to_db(
+            conn,
+            [
+                ("ETB renamed", "https://www.tcgplayer.com/product/1/etb?page=1"),
+                ("Booster Box", "https://www.tcgplayer.com/product/2/box?page=1"),
+            ],
+        )
+        rows = conn.execute("SELECT name, url FROM products ORDER BY id").fetchall()
+        self.assertEqual(
+            rows,
+            [
+                ("ETB", "https://www.tcgplayer.com/product/1/etb?page=1"),
+                ("Booster Box", "https://www.tcgplayer.com/product/2/box?page=1"),
+            ],
+        )
+        conn.close()
+
+    @unittest.skipIf(link_scraper.lxml is None, "lxml not installed")
+    def test_parse_search_page_extracts_cards_with_absolute_urls(self):
+        self.assertEqual(
+            parse_search_page(SEARCH_PAGE_HTML),
+            [
+                ("Elite Trainer Box", "https://www.tcgplayer.com/product/1/pokemon-etb?page=1"),
+                ("Booster Box", "https://www.tcgplayer.com/product/2/pokemon-booster-box?page=1"),
+            ],
+        )
+
+    @unittest.skipIf(link_scraper.lxml is None, "lxml not installed")
+    def test_parse_search_page_returns_empty_for_js_shell(self):
+        self.assertEqual(parse_search_page("<html><body><div id='app'></div></body></html>"), [])
+        self.assertEqual(parse_search_page(""), [])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,7 +1,20 @@
 import unittest
 from pathlib import Path
+from unittest import mock
 
-from populate_db import has_minimum_parse_data, page_looks_like_tcgplayer_shell, parse_tcgplayer
+from bs4 import BeautifulSoup
+from bs4.element import Script
+
+import populate_db
+from populate_db import (
+    has_minimum_parse_data,
+    load_json,
+    html_looks_like_tcgplayer_shell,
+    page_looks_like_tcgplayer_shell,
+    parse_tcgplayer,
+    parse_tcgplayer_fast,
+    parse_tcgplayer_jsonld_only,
+)
 
 
 FIXTURES = Path(__file__).parent / "fixtures"
@@ -31,6 +44,114 @@ class TestParseTcgplayer(unittest.TestCase):
         self.assertEqual(parsed["lowest_total_price"], 149.99)
         self.assertTrue(has_minimum_parse_data(parsed))
 
+    def test_jsonld_fast_path_only_when_dom_adds_nothing(self):
+        jsonld = (
+            '<script type="application/ld+json">'
+            '{"offers": {"price": "54.99", "shippingDetails": {"shippingRate": {"value": "4.99"}}},'
+            ' "description": "37 listings"}</script>'
+        )
+        fast = parse_tcgplayer_jsonld_only(f"<html><head>{jsonld}</head><body></body></html>")
+        self.assertEqual(fast["listing_count"], 37)
+        self.assertEqual(fast["lowest_total_price"], 59.98)
+        self.assertIsNone(fast["set_name"])
+
+        with_set_name = f'{jsonld}<span data-testid="lblProductDetailsSetName">Base Set</span>'
+        self.assertIsNone(parse_tcgplayer_jsonld_only(with_set_name))
+        self.assertEqual(parse_tcgplayer(with_set_name)["set_name"], "Base Set")
+        self.assertIsNone(parse_tcgplayer_jsonld_only(f"<!-- {jsonld} -->"))
+
+        with_quantity = f"{jsonld}<p>Current&nbsp;Quantity: 42</p>"
+        self.assertIsNone(parse_tcgplayer_jsonld_only(with_quantity))
+        self.assertEqual(parse_tcgplayer(with_quantity)["current_quantity"], 42)
+
+    def test_fast_parser_reads_the_stable_layout(self):
+        html = (
+            '<html><body><span data-testid="lblProductDetailsSetName"> Base Set </span>'
+            '<section class="price-points__upper"><span class="price-points__upper__price">$1,234.50</span></section>'
+            '<table class="price-points__lower"><tr><td><span class="text">Current Quantity:</span></td>'
+            '<td><span class="price-points__lower__price">45</span></td></tr></table>'
+            '<div class="spotlight__shipping">+ $1.25 Shipping</div>'
+            '<script type="application/ld+json">{"offers": {"price": "54.99"}}</script></body></html>'
+        )
+        fast = parse_tcgplayer_fast(html)
+        self.assertEqual(fast["set_name"], "Base Set")
+        self.assertEqual(fast["market_price"], 1234.5)
+        self.assertEqual(fast["current_quantity"], 45)
+        self.assertEqual(fast["lowest_shipping"], 1.25)
+        self.assertEqual(fast["lowest_total_price"], 56.24)
+        self.assertIsNone(parse_tcgplayer_fast("<html><body>29 listings</body></html>"))
+
+    def test_fast_parser_defers_pages_it_can_only_half_read(self):
+        html = (
+            '<html><head><meta property="og:description" content="12 listings"></head><body>'
+            '<span data-testid="lblProductDetailsSetName">Base</span>'
+            '<span class="price-point__data">$4.00</span>'
+            '<div class="spotlight__shipping">+ $1.00 Shipping</div></body></html>'
+        )
+        self.assertIsNone(parse_tcgplayer_fast(html))
+        with mock.patch("populate_db.FAST_PARSE_ENABLED", True):
+            parsed = parse_tcgplayer(html)
+        self.assertEqual(parsed["listing_count"], 12)
+        self.assertEqual(parsed["lowest_price"], 4.0)
+        self.assertEqual(parsed["lowest_shipping"], 1.0)
+        self.assertEqual(parsed["set_name"], "Base")
+
+    def test_load_json_matches_stdlib_on_lenient_input(self):
+        self.assertEqual(load_json('{"offers": {"price": "54.99"}}'), {"offers": {"price": "54.99"}})
+        self.assertEqual(load_json('{"ratingValue": NaN}').keys(), {"ratingValue"})
+        with self.assertRaises(ValueError):
+            load_json("{not json")
+
+    def test_load_json_uses_orjson_for_bs4_script_strings(self):
+        if populate_db.orjson is None:
+            self.skipTest("orjson not installed")
+        soup = BeautifulSoup('<script type="application/ld+json">{"offers": {"price": "54.99"}}</script>', "html.parser")
+        script_text = soup.find("script").string
+        self.assertIsInstance(script_text, Script)
+        with mock.patch("populate_db.json.loads", side_effect=AssertionError("stdlib fallback used")):
+            self.assertEqual(load_json(script_text), {"offers": {"price": "54.99"}})
+
+    def test_market_price_is_the_upper_price_after_its_header(self):
+        parsed = parse_tcgplayer(
+            '<html><body><span class="price-points__upper__price">$99.00</span>'
+            '<div class="price-points__upper__header__title">Market Price</div>'
+            '<span class="price-points__upper__price">$12.50</span>'
+            '<span class="price">$3.10</span><div class="price">$2.20</div>'
+            '<div class="spotlight__shipping">+ $1.25 Shipping</div></body></html>'
+        )
+        # The first upper price precedes the header and is not "Market Price", so
+        # the fallback (first upper price) applies.
+        self.assertEqual(parsed["market_price"], 99.0)
+        self.assertEqual(parsed["lowest_price"], 2.2)
+        self.assertEqual(parsed["lowest_total_price"], 3.45)
+
+        parsed = parse_tcgplayer(
+            '<html><body><div class="price-points__upper__header__title">Market Price</div>'
+            '<span class="price-points__upper__price">$12.50</span>'
+            '<span class="price-points__upper__price">$99.00</span></body></html>'
+        )
+        self.assertEqual(parsed["market_price"], 12.5)
+
+    def test_text_fallback_reads_counts_split_across_tags(self):
+        parsed = parse_tcgplayer(
+            "<html><body><div><b>29</b> listings</div>"
+            "<p>Current <span>Quantity</span>:&nbsp;42</p><p>Current Sellers: <em>12</em></p></body></html>"
+        )
+        self.assertEqual(parsed["listing_count"], 29)
+        self.assertEqual(parsed["current_quantity"], 42)
+        self.assertEqual(parsed["current_sellers"], 12)
+
+    def test_text_fallback_ignores_scripts_comments_and_attributes(self):
+        parsed = parse_tcgplayer(
+            "<html><head><style>.x:after { content: '5 listings'; }</style>"
+            "<script>var msg = 'Only 3 listings left';</script></head>"
+            "<body><!-- Current Sellers: 9 --><div title='Current Quantity: 7'>loading</div></body></html>"
+        )
+        self.assertIsNone(parsed["listing_count"])
+        self.assertIsNone(parsed["current_quantity"])
+        self.assertIsNone(parsed["current_sellers"])
+        self.assertFalse(has_minimum_parse_data(parsed))
+
     def test_parse_gate_rejects_empty_html(self):
         parsed = parse_tcgplayer("<html><body>No market data here</body></html>")
         self.assertFalse(has_minimum_parse_data(parsed))
@@ -42,6 +163,13 @@ class TestParseTcgplayer(unittest.TestCase):
 
         self.assertTrue(page_looks_like_tcgplayer_shell(FakeDriver()))
 
+    def test_html_shell_detector_ignores_rendered_pages_without_data(self):
+        self.assertTrue(html_looks_like_tcgplayer_shell("<html><body><div id='app'></div></body></html>"))
+        rendered = "<html><body><div class='product-details__listings'>No listings</div>" + " " * 60000 + "</body></html>"
+        self.assertFalse(html_looks_like_tcgplayer_shell(rendered))
+        shell_title = "<html><head><title>Your Trusted Marketplace for Collectible Trading Card Games - TCGplayer</title></head>"
+        self.assertTrue(html_looks_like_tcgplayer_shell(shell_title + " " * 60000))
+
 
 if __name__ == "__main__":
     unittest.main()
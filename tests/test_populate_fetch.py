@@ -0,0 +1,78 @@
+import unittest
+
+from populate_db import fetch_page_with_retries, prefetch_pages, read_capped_text
+
+
+class FakeResponse:
+    encoding = "utf-8"
+
+    def __init__(self, url, status_code=200):
+        self.status_code = status_code
+        self.body = f"<html>{url}</html>".encode("utf-8") if status_code == 200 else b""
+        self.headers = {"ETag": '"v2"', "Last-Modified": "Tue, 13 Oct 2026 00:00:00 GMT"}
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start : start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self):
+        self.urls = []
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        self.urls.append(url)
+        return FakeResponse(url)
+
+
+class TestPrefetchPages(unittest.TestCase):
+    def test_prefetch_keeps_input_order_and_skips_missing_urls(self):
+        session = FakeSession()
+        rows = [{"url": f"https://example.com/{i}"} for i in range(5)]
+        rows.insert(2, {"name": "No URL"})
+
+        results = list(prefetch_pages(session, rows, 3, 0, 0))
+
+        self.assertEqual([row for row, _, _ in results], rows)
+        self.assertIsNone(results[2][1])
+        self.assertEqual(results[0][1], ("<html>https://example.com/0</html>", 200, 1, "ok"))
+        self.assertIsNone(results[0][2])
+        self.assertEqual(sorted(session.urls), sorted(row["url"] for row in rows if "url" in row))
+
+
+class ConditionalSession(FakeSession):
+    def get(self, url, headers=None, timeout=None, stream=False):
+        self.urls.append((url, dict(headers or {})))
+        if (headers or {}).get("If-None-Match") == '"v2"':
+            return FakeResponse(url, status_code=304)
+        return FakeResponse(url)
+
+
+class TestConditionalFetch(unittest.TestCase):
+    def test_validators_are_sent_and_refreshed(self):
+        session = ConditionalSession()
+        validators = {"etag": '"v1"', "last_modified": None}
+
+        html, status, _, reason = fetch_page_with_retries(session, "https://example.com/p", validators=validators)
+        self.assertEqual((status, reason), (200, "ok"))
+        self.assertTrue(html)
+        self.assertEqual(session.urls[0][1], {"If-None-Match": '"v1"'})
+        self.assertEqual(validators["etag"], '"v2"')
+
+        html, status, attempts, reason = fetch_page_with_retries(session, "https://example.com/p", validators=validators)
+        self.assertEqual((html, status, attempts, reason), (None, 304, 1, "not_modified"))
+        self.assertEqual(session.urls[1][1]["If-Modified-Since"], "Tue, 13 Oct 2026 00:00:00 GMT")
+
+
+class TestReadCappedText(unittest.TestCase):
+    def test_body_is_truncated_at_the_byte_cap(self):
+        resp = FakeResponse("https://example.com/" + "x" * 100)
+        self.assertEqual(read_capped_text(resp, max_bytes=12, chunk_size=5), "<html>https:")
+        self.assertEqual(read_capped_text(resp, chunk_size=7), resp.body.decode("utf-8"))
+
+
+if __name__ == "__main__":
+    unittest.main()